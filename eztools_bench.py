@@ -0,0 +1,336 @@
+import argparse
+import json
+import os
+import platform
+import queue
+import shutil
+import stat
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import psutil
+
+from eztools_core import Engine, JobScheduler, TOOLS
+
+
+# Script des outils de substitution: mêmes options --csv/--csvf que les outils EZ,
+# comportement réglé par les variables d'environnement EZBENCH_*
+STAND_IN_SOURCE = '''#!{python}
+import os, sys, time
+
+args = sys.argv[1:]
+lines = int(os.environ.get("EZBENCH_LINES", "1000"))
+rate = float(os.environ.get("EZBENCH_LINES_PER_SECOND", "0"))
+stderr_every = int(os.environ.get("EZBENCH_STDERR_EVERY", "0"))
+exit_code = int(os.environ.get("EZBENCH_EXIT_CODE", "0"))
+csv_rows = int(os.environ.get("EZBENCH_CSV_ROWS", "1000"))
+
+name = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+source = args[args.index("-f") + 1] if "-f" in args else args[args.index("-d") + 1]
+started = time.monotonic()
+for i in range(lines):
+    if stderr_every and i % stderr_every == 0:
+        sys.stderr.write(f"Warning: entrée {{i}} illisible dans {{source}}\\n")
+    else:
+        sys.stdout.write(f"{{name}}: traitement de l'entrée {{i}} ({{i * 100 // lines}}%)\\n")
+    if rate:
+        delay = started + (i + 1) / rate - time.monotonic()
+        if delay > 0:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            time.sleep(delay)
+sys.stdout.flush()
+
+if "--csv" in args:
+    output_dir = args[args.index("--csv") + 1]
+    output_name = args[args.index("--csvf") + 1] if "--csvf" in args else f"20240101000000_{{name}}_Output.csv"
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, output_name), "w", encoding="utf-8") as f:
+        f.write("EntryNumber,InUse,ParentPath,FileName,FileSize,Created0x10,LastModified0x10\\n")
+        for i in range(csv_rows):
+            f.write(f"{{i}},True,.\\\\Windows\\\\System32,fichier_{{i}}.dll,{{i * 512}},"
+                    f"2024-03-{{1 + i % 28:02d}} 12:{{i % 60:02d}}:00.0000000,2024-03-{{1 + i % 28:02d}} 13:00:00.0000000\\n")
+    # Comme le vrai PECmd: un second CSV <nom>_Timeline.csv à côté de celui demandé
+    if name == "PECmd":
+        with open(os.path.join(output_dir, os.path.splitext(output_name)[0] + "_Timeline.csv"), "w", encoding="utf-8") as f:
+            f.write("RunTime,ExecutableName\\n")
+            for i in range(csv_rows):
+                f.write(f"2024-03-{{1 + i % 28:02d}} 14:00:00,PROGRAMME_{{i}}.EXE\\n")
+sys.exit(exit_code)
+'''
+
+# Scénarios par défaut: nom -> réglages des outils de substitution
+SCENARIOS = {
+    "calme": {"lines": 200, "lines_per_second": 400, "stderr_every": 0, "exit_code": 0, "csv_rows": 10_000},
+    "bavard": {"lines": 200_000, "lines_per_second": 0, "stderr_every": 0, "exit_code": 0, "csv_rows": 10_000},
+    "erreurs": {"lines": 50_000, "lines_per_second": 0, "stderr_every": 2, "exit_code": 0, "csv_rows": 1_000},
+    "echec": {"lines": 1_000, "lines_per_second": 0, "stderr_every": 10, "exit_code": 1, "csv_rows": 0},
+    "gros_csv": {"lines": 1_000, "lines_per_second": 0, "stderr_every": 0, "exit_code": 0, "csv_rows": 500_000}
+}
+
+# Intervalle de la mesure de latence de la boucle d'événements (ms)
+TICK_MS = 10
+
+
+def make_stand_in_tools(tools_dir):
+    """Crée un dossier d'outils de substitution ayant la même structure que net6.
+
+    Les substituts sont des scripts Python exécutables: ils fonctionnent sous Linux et macOS,
+    pas sous Windows où seuls les vrais .exe peuvent être lancés.
+    """
+    if os.name == "nt":
+        raise RuntimeError("Les outils de substitution ne peuvent pas être lancés sous Windows")
+
+    source = STAND_IN_SOURCE.format(python=sys.executable)
+    for info in TOOLS.values():
+        path = os.path.join(tools_dir, info["executable"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(source)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+    reb_dir = os.path.join(tools_dir, "RECmd", "BatchExamples")
+    os.makedirs(reb_dir, exist_ok=True)
+    with open(os.path.join(reb_dir, "CTL.reb"), "w", encoding="utf-8") as f:
+        f.write("Description: substitut\nKeys: []\n")
+    return tools_dir
+
+
+def make_evidence(root):
+    """Crée une racine de preuve minimale contenant les entrées par défaut de chaque outil"""
+    with open(os.path.join(root, "$MFT"), "wb") as f:
+        f.write(b"FILE0" * 1024)
+    for parts in (("Windows", "Prefetch"), ("Windows", "System32", "config")):
+        os.makedirs(os.path.join(root, *parts), exist_ok=True)
+    recent = os.path.join(root, "Users", "bench", "AppData", "Roaming", "Microsoft", "Windows", "Recent")
+    for folder in ("CustomDestinations", "AutomaticDestinations"):
+        os.makedirs(os.path.join(recent, folder), exist_ok=True)
+    return root
+
+
+def set_scenario_env(config):
+    for key, value in config.items():
+        os.environ[f"EZBENCH_{key.upper()}"] = str(value)
+
+
+def summarize_latencies(latencies):
+    """Moyenne, 95e centile et maximum des retards de la boucle d'événements, en ms"""
+    if not latencies:
+        return {"mean": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(latencies)
+    return {
+        "mean": sum(ordered) / len(ordered) * 1000,
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max": ordered[-1] * 1000
+    }
+
+
+def bench_headless(engine, tool, input_path, output_dir):
+    """Mesure le chemin d'exécution de l'interface sans Tk.
+
+    Reproduit run_analysis: QueueRunner dans un thread de fond, relève de la file par lots
+    toutes les POLL_INTERVAL_MS depuis le thread principal, comme poll_runner. La latence
+    retenue est le temps de traitement de chaque relève.
+    """
+    from gui4easytools import EZToolsGUI, QueueRunner
+
+    process = psutil.Process()
+    job = engine.build_job(tool, input_path, output_dir, f"{tool}_bench.csv" if tool != "JLECmd" else f"{tool}_bench")
+    runner = QueueRunner()
+    latencies = []
+    peak_rss = process.memory_info().rss
+    lines = 0
+
+    started = time.monotonic()
+    runner.start(lambda r: JobScheduler(1).run(r, [job]))
+    finished = False
+    while not finished:
+        time.sleep(EZToolsGUI.POLL_INTERVAL_MS / 1000)
+        tick_started = time.monotonic()
+        chunks = []
+        for _ in range(EZToolsGUI.POLL_BATCH_SIZE):
+            try:
+                kind, payload = runner.queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "text":
+                chunks.append(payload)
+            elif kind == "finished":
+                finished = True
+                break
+        lines += "".join(chunks).count("\n")
+        # Sans Tk, la latence est le temps de traitement d'une relève: la durée pendant
+        # laquelle la boucle d'événements de l'interface serait bloquée
+        latencies.append(time.monotonic() - tick_started)
+        peak_rss = max(peak_rss, process.memory_info().rss)
+    wall = time.monotonic() - started
+    return job, wall, lines, latencies, peak_rss
+
+
+def bench_tk(engine, tool, input_path, output_dir):
+    """Mesure run_analysis dans une vraie fenêtre Tk (nécessite un affichage)"""
+    import tkinter as tk
+    from gui4easytools import EZToolsGUI
+
+    # L'interface charge ses ressources (icône) depuis le dossier du projet
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    root = tk.Tk()
+    root.withdraw()
+    # Cache, historique des débits et journaux de la mesure restent dans son dossier de travail
+    app = EZToolsGUI(root, data_dir=os.path.join(output_dir, "gui"))
+    app.engine = engine
+    app.tools = engine.tools
+    app.selected_tool = tool
+    app.input_path.set(input_path)
+    app.output_path.set(output_dir)
+    app.output_name.set(f"{tool}_bench.csv" if tool != "JLECmd" else f"{tool}_bench")
+    for option in (app.force_rerun, app.merge_timeline, app.index_results, app.convert_parquet):
+        option.set(False)
+    app.open_with_timeline_explorer = lambda csv_file: None
+
+    process = psutil.Process()
+    state = {"lines": 0, "latencies": [], "peak_rss": process.memory_info().rss, "expected": None}
+    insert = app.console.insert
+
+    def counting_insert(index, chars, *args):
+        state["lines"] += chars.count("\n")
+        return insert(index, chars, *args)
+    app.console.insert = counting_insert
+
+    def tick():
+        now = time.monotonic()
+        if state["expected"] is not None:
+            state["latencies"].append(max(0.0, now - state["expected"]))
+        state["peak_rss"] = max(state["peak_rss"], process.memory_info().rss)
+        if str(app.run_button["state"]) == tk.NORMAL and not app.runner.is_running():
+            root.quit()
+            return
+        state["expected"] = now + TICK_MS / 1000
+        root.after(TICK_MS, tick)
+
+    started = time.monotonic()
+    app.run_analysis()
+    job = app.runner.jobs[0] if app.runner.jobs else None
+    root.after(TICK_MS, tick)
+    root.mainloop()
+    wall = time.monotonic() - started
+    job = job or (app.runner.jobs[0] if app.runner.jobs else None)
+    root.destroy()
+    return job, wall, state["lines"], state["latencies"], state["peak_rss"]
+
+
+def has_display():
+    return os.name == "nt" or bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def run_scenario(name, config, tools_dir, evidence_root, work_dir, tool="MFTECmd", mode="headless"):
+    """Exécute un scénario et retourne ses mesures"""
+    set_scenario_env(config)
+    engine = Engine(tools_dir)
+    input_path = engine.default_input_path(evidence_root, tool, "bench")
+    output_dir = tempfile.mkdtemp(prefix=f"{name}_", dir=work_dir)
+
+    bench = bench_tk if mode == "tk" else bench_headless
+    job, wall, lines, latencies, peak_rss = bench(engine, tool, input_path, output_dir)
+    return {
+        "name": name,
+        "tool": tool,
+        "mode": mode,
+        "config": config,
+        "status": job.status if job else None,
+        "returncode": job.returncode if job else None,
+        "wall_seconds": wall,
+        "lines": lines,
+        "lines_per_second": lines / wall if wall else 0.0,
+        "loop_latency_ms": summarize_latencies(latencies),
+        "peak_rss_mb": peak_rss / 1024**2
+    }
+
+
+def compare(previous, current):
+    """Écarts (en %) des mesures principales entre deux résultats, scénario par scénario"""
+    before = {scenario["name"]: scenario for scenario in previous.get("scenarios", [])}
+    rows = []
+    for scenario in current["scenarios"]:
+        old = before.get(scenario["name"])
+        if not old:
+            continue
+        for metric, new_value, old_value in (
+            ("wall_seconds", scenario["wall_seconds"], old["wall_seconds"]),
+            ("lines_per_second", scenario["lines_per_second"], old["lines_per_second"]),
+            ("loop_latency_p95_ms", scenario["loop_latency_ms"]["p95"], old["loop_latency_ms"]["p95"]),
+            ("peak_rss_mb", scenario["peak_rss_mb"], old["peak_rss_mb"])
+        ):
+            change = (new_value - old_value) / old_value * 100 if old_value else 0.0
+            rows.append((scenario["name"], metric, old_value, new_value, change))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesure le coût de l'application avec des outils EZ de substitution")
+    parser.add_argument("--output", default=f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json", help="Fichier JSON des résultats")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Scénario à exécuter (tous par défaut)")
+    parser.add_argument("--tool", default="MFTECmd", choices=list(TOOLS), help="Outil simulé")
+    parser.add_argument("--mode", choices=["auto", "tk", "headless"], default="auto", help="tk: vraie fenêtre; headless: relève sans Tk")
+    parser.add_argument("--lines", type=int, help="Remplace le nombre de lignes de sortie des scénarios")
+    parser.add_argument("--lines-per-second", type=float, help="Remplace le débit de sortie des scénarios (0: sans limite)")
+    parser.add_argument("--stderr-every", type=int, help="Remplace la fréquence des lignes sur stderr (0: aucune)")
+    parser.add_argument("--exit-code", type=int, help="Remplace le code de sortie des outils")
+    parser.add_argument("--csv-rows", type=int, help="Remplace le nombre de lignes des CSV produits")
+    parser.add_argument("--compare", help="Résultats JSON précédents à comparer")
+    args = parser.parse_args(argv)
+
+    mode = args.mode
+    if mode == "auto":
+        mode = "tk" if has_display() else "headless"
+
+    overrides = {
+        key: value for key, value in (
+            ("lines", args.lines), ("lines_per_second", args.lines_per_second),
+            ("stderr_every", args.stderr_every), ("exit_code", args.exit_code), ("csv_rows", args.csv_rows)
+        ) if value is not None
+    }
+
+    work_dir = tempfile.mkdtemp(prefix="eztools_bench_")
+    output = os.path.abspath(args.output)
+    try:
+        tools_dir = make_stand_in_tools(os.path.join(work_dir, "net6"))
+        evidence_root = make_evidence(tempfile.mkdtemp(prefix="evidence_", dir=work_dir))
+        scenarios = []
+        for name in args.scenario or list(SCENARIOS):
+            config = dict(SCENARIOS[name], **overrides)
+            result = run_scenario(name, config, tools_dir, evidence_root, work_dir, args.tool, mode)
+            scenarios.append(result)
+            print(f"{name:<10} {result['wall_seconds']:7.2f} s  {result['lines_per_second']:10.0f} lignes/s  "
+                  f"latence p95 {result['loop_latency_ms']['p95']:6.1f} ms  mémoire {result['peak_rss_mb']:6.1f} Mo  "
+                  f"{result['status']}")
+    except RuntimeError as e:
+        print(f"Erreur: {str(e)}", file=sys.stderr)
+        return 2
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "mode": mode,
+        "scenarios": scenarios
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Résultats enregistrés : {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        for name, metric, old_value, new_value, change in compare(previous, results):
+            print(f"{name:<10} {metric:<20} {old_value:12.2f} -> {new_value:12.2f}  ({change:+.1f} %)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
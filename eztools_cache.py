@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+
+# Taille maximale par défaut du cache de résultats (octets)
+DEFAULT_MAX_BYTES = 20 * 1024**3
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
+
+def _walk_files(path):
+    """Parcourt récursivement un fichier ou un dossier en ordre stable, en retournant (chemin, stat)"""
+    st = os.stat(path)
+    if not os.path.isdir(path):
+        yield path, st
+        return
+    with os.scandir(path) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from _walk_files(entry.path)
+        elif entry.is_file(follow_symlinks=False):
+            yield entry.path, entry.stat()
+
+
+def hash_file(path, block_size=1024 * 1024):
+    """SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_inputs(paths, hash_contents=False):
+    """Empreinte des entrées d'un outil: chemins, tailles et dates de modification.
+
+    Avec hash_contents, le contenu de chaque fichier est aussi haché (plus lent, mais
+    fiable quand les dates de modification ne le sont pas, par exemple sur une image montée).
+    Lève OSError si une entrée est illisible.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        for file_path, st in _walk_files(path):
+            digest.update(f"{file_path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8", "surrogatepass"))
+            if hash_contents:
+                digest.update(hash_file(file_path).encode())
+    return digest.hexdigest()
+
+
+def cache_key(tool, args, fingerprint):
+    """Clé de cache d'une exécution: outil, arguments (hors sortie) et empreinte des entrées"""
+    payload = json.dumps({"tool": tool, "args": [str(arg) for arg in args], "inputs": fingerprint}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_live_system_path(path):
+    """Vrai si path est sur le volume système en cours d'utilisation (Windows uniquement).
+
+    Sur ce volume, les dates de modification de $MFT ou des ruches ne suivent pas leur
+    contenu: l'empreinte des entrées ne permet pas de réutiliser un résultat ou une copie.
+    """
+    if os.name != "nt":
+        return False
+    drive = os.path.splitdrive(os.path.abspath(path))[0]
+    return drive.upper() == os.environ.get("SystemDrive", "C:").upper()
+
+
+def place_file(source, destination):
+    """Place une copie indépendante d'un fichier.
+
+    Jamais de lien physique: une écriture ultérieure sur l'un des deux chemins ne doit
+    pas modifier l'autre (sortie réutilisée d'une analyse à l'autre, entrée du cache).
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+    partial = f"{destination}.part"
+    shutil.copy2(source, partial)
+    os.replace(partial, destination)
+
+
+class ResultCache:
+    """Cache persistant des CSV produits par les outils, avec éviction LRU par taille.
+
+    Chaque entrée est un dossier nommé d'après sa clé; index.json garde la taille de
+    chaque fichier et la date de dernière utilisation de chaque entrée.
+    """
+
+    INDEX_NAME = "index.json"
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = os.path.abspath(cache_dir or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, self.INDEX_NAME), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        path = os.path.join(self.cache_dir, self.INDEX_NAME)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def lookup(self, key):
+        """Retourne les fichiers en cache pour une clé, ou None"""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            files = [os.path.join(self._entry_dir(key), name) for name in entry["files"]]
+            # Une entrée incomplète ou modifiée (ou d'un format antérieur, sans tailles) est écartée
+            if len(entry.get("sizes", [])) != len(files) or not all(
+                os.path.isfile(path) and os.path.getsize(path) == size for path, size in zip(files, entry["sizes"])
+            ):
+                self._remove(key)
+                self._save_index()
+                return None
+            entry["last_used"] = time.time()
+            self._save_index()
+            return files
+
+    def store(self, key, files, names=None):
+        """Ajoute une copie des fichiers produits par une exécution, puis applique la limite de taille.
+
+        names, s'il est donné, remplace le nom de chaque fichier dans l'entrée.
+        """
+        names = list(names or [os.path.basename(path) for path in files])
+        sizes = [os.path.getsize(path) for path in files]
+        if sum(sizes) > self.max_bytes:
+            return
+
+        with self._lock:
+            self._remove(key)
+            entry_dir = self._entry_dir(key)
+            os.makedirs(entry_dir, exist_ok=True)
+            for path, name in zip(files, names):
+                place_file(path, os.path.join(entry_dir, name))
+            self._index[key] = {
+                "files": names,
+                "sizes": sizes,
+                "size": sum(sizes),
+                "last_used": time.time()
+            }
+            self._evict()
+            self._save_index()
+
+    def _remove(self, key):
+        self._index.pop(key, None)
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def _evict(self):
+        # Supprimer les entrées les moins récemment utilisées jusqu'à repasser sous la limite
+        total = sum(entry["size"] for entry in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._index[key]["size"]
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+            self._save_index()
@@ -0,0 +1,225 @@
+import argparse
+import json
+import os
+import sys
+from dataclasses import replace
+from datetime import datetime
+
+from eztools_cache import DEFAULT_MAX_BYTES, ResultCache
+from eztools_core import Engine, TOOLS, ToolRunner, find_users
+from eztools_columnar import columnar_available, convert_csv
+from eztools_fleet import run_fleet
+from eztools_governor import Governor, PRIORITIES, parse_affinity, profile_settings
+from eztools_index import index_csv, index_path
+from eztools_package import package_run
+from eztools_staging import Stager
+from eztools_preflight import ThroughputHistory, format_duration, preflight, remaining_time
+from eztools_telemetry import write_run_report
+from eztools_timeline import merge_timelines
+
+
+def load_manifest(path):
+    """Lit un manifeste JSON: un objet ou une liste d'objets décrivant chacun une analyse.
+
+    Clés reconnues: root (ou drive), output_dir, tools (tous par défaut),
+    user (nom ou liste, tous les profils trouvés par défaut), max_workers, tools_dir.
+    Une analyse avec roots (liste de racines) est exécutée en mode flotte.
+    """
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    entries = manifest if isinstance(manifest, list) else [manifest]
+    for entry in entries:
+        if not entry.get("root") and not entry.get("drive") and not entry.get("roots"):
+            raise ValueError("Chaque analyse du manifeste doit définir root, drive ou roots")
+        if not entry.get("output_dir"):
+            raise ValueError("Chaque analyse du manifeste doit définir output_dir")
+        unknown = [tool for tool in entry.get("tools", []) if tool not in TOOLS]
+        if unknown:
+            raise ValueError(f"Outils inconnus: {', '.join(unknown)}")
+    return entries
+
+
+def run_entry(entry, *, tools_dir=None, max_workers=None, cache=None, force=False, hash_contents=False,
+              timeline=False, index=False, parquet=False, governor=None, package=False, stager=None,
+              shard_recmd=False, batch_files=None):
+    """Exécute une analyse du manifeste et retourne ses tâches terminées.
+
+    Les options (celles de la ligne de commande) ne se passent que par nom.
+    """
+    engine = Engine(entry.get("tools_dir") or tools_dir, cache=cache, hash_contents=hash_contents)
+    engine.force = force
+    engine.stager = stager
+    engine.shard_recmd = shard_recmd
+    engine.recmd_batch_files = batch_files
+    root = entry.get("root") or entry.get("drive")
+    output_dir = entry["output_dir"]
+    os.makedirs(output_dir, exist_ok=True)
+
+    users = entry.get("user")
+    if isinstance(users, str):
+        users = [users]
+    if users is None:
+        users = find_users(root) or []
+
+    jobs = engine.build_jobs(
+        root,
+        entry.get("tools") or list(TOOLS),
+        output_dir,
+        users=users,
+        on_skip=lambda name, reason: print(f"{name} ignoré: {reason}")
+    )
+
+    runner = ToolRunner()
+    if governor is not None:
+        max_workers = max_workers or governor.max_workers
+    max_workers = max_workers or entry.get("max_workers") or os.cpu_count() or 1
+    if governor is not None:
+        # Le nombre de tâches simultanées retenu limite aussi les partitions de RECmd
+        runner.governor = Governor(replace(governor, max_workers=max_workers))
+
+    # Pré-analyse: volume des entrées et durée estimée de chaque tâche
+    history = ThroughputHistory()
+    preflight(jobs, history)
+    for job in jobs:
+        print(f"{job.name:<24} {job.input_files:8d} fichiers  {job.input_bytes / 1024**2:10.1f} Mo  ~{format_duration(job.estimate)}")
+    if jobs:
+        print(f"Durée estimée : {format_duration(remaining_time(jobs, max_workers))}\n")
+
+    try:
+        runner.run(jobs, max_workers=max_workers)
+    except KeyboardInterrupt:
+        runner.cancel(wait=True)
+        raise
+    history.record(jobs)
+
+    report = os.path.join(output_dir, f"run_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    write_run_report(report, jobs, root=root)
+    print(f"Rapport d'exécution : {report}")
+
+    # Paquet de preuves avant tout post-traitement, pour figer les résultats bruts des outils
+    if package:
+        archive = os.path.join(output_dir, f"evidence_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
+        package_run(archive, jobs, engine.tools, output_dir, extra_files=[report], write=lambda text: print(text, end=""))
+
+    # Conversion en premier: l'indexation et la super-timeline lisent les fichiers Parquet
+    if parquet:
+        for path in runner.output_files:
+            result = convert_csv(path)
+            print(f"Parquet créé : {result['path']} ({result['rows']} lignes, ratio {result['ratio']:.1f}x, "
+                  f"{result['mb_per_second']:.1f} Mo/s)")
+
+    if index and runner.output_files:
+        db_path = index_path(output_dir)
+        count = sum(index_csv(db_path, path) for path in runner.output_files)
+        print(f"Index mis à jour ({count} lignes) : {db_path}")
+
+    if timeline and runner.output_files:
+        output_file = os.path.join(output_dir, f"SuperTimeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        count = merge_timelines([str(path) for path in runner.output_files], output_file)
+        print(f"Super-timeline créée ({count} événements) : {output_file}")
+    return jobs
+
+
+def run_fleet_entry(entry, tools_dir=None, processes=None, restart=False):
+    """Exécute une analyse de flotte et retourne True si toutes ses tâches ont réussi"""
+    checkpoint = run_fleet(
+        entry["roots"],
+        entry["output_dir"],
+        tools=entry.get("tools"),
+        tools_dir=entry.get("tools_dir") or tools_dir,
+        processes=processes or entry.get("processes"),
+        restart=restart
+    )
+    return all(result["status"] == "Terminé" for result in checkpoint.values())
+
+
+def print_summary(jobs):
+    print()
+    for job in jobs:
+        returncode = "" if job.returncode is None else job.returncode
+        print(f"{job.name:<24} {job.status:<12} {job.elapsed:8.1f} s  CPU {job.usage.cpu_seconds:7.1f} s  "
+              f"{job.usage.peak_rss / 1024**2:8.1f} Mo  {returncode}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exécute les outils EZ sans interface à partir d'un manifeste JSON")
+    parser.add_argument("manifest", help="Fichier JSON décrivant la ou les analyses à lancer")
+    parser.add_argument("--tools-dir", help="Dossier des outils (net6 par défaut)")
+    parser.add_argument("--max-workers", type=int, help="Nombre maximal d'outils lancés en parallèle")
+    parser.add_argument("--cache-dir", help="Dossier du cache de résultats (cache par défaut)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // 1024**2, help="Taille maximale du cache, en Mo")
+    parser.add_argument("--no-cache", action="store_true", help="Ne pas utiliser le cache de résultats")
+    parser.add_argument("--force", action="store_true", help="Relancer les outils même si leurs entrées n'ont pas changé")
+    parser.add_argument("--hash-contents", action="store_true", help="Inclure le contenu des entrées dans leur empreinte")
+    parser.add_argument("--timeline", action="store_true", help="Fusionner les CSV produits en une super-timeline triée")
+    parser.add_argument("--index", action="store_true", help="Charger les CSV produits dans l'index SQLite du dossier de sortie (voir eztools_index.py search)")
+    parser.add_argument("--parquet", action="store_true", help="Convertir les CSV produits en Parquet compressé (nécessite pyarrow)")
+    parser.add_argument("--package", action="store_true", help="Créer une archive ZIP des entrées et des résultats avec un manifeste SHA-256")
+    parser.add_argument("--stage", action="store_true", help="Copier les artefacts dans un dossier local avant de les analyser (copies réutilisées)")
+    parser.add_argument("--staging-dir", help="Dossier des copies locales (staging par défaut)")
+    parser.add_argument("--shard-recmd", action="store_true", help="Lancer RECmd ruche par ruche en parallèle et fusionner les CSV")
+    parser.add_argument("--reb", action="append", help="Fichier .reb de RECmd en mode partitionné (répétable; CTL.reb par défaut)")
+    parser.add_argument("--low-impact", action="store_true", help="Profil faible impact: priorité minimale, un outil à la fois, démarrages différés sous charge")
+    parser.add_argument("--priority", choices=list(PRIORITIES), help="Priorité des processus des outils")
+    parser.add_argument("--cpu-affinity", type=parse_affinity, help="Processeurs autorisés pour les outils (ex. 0,2-3)")
+    parser.add_argument("--max-cpu", type=float, help="Différer les démarrages au-delà de cette charge CPU de la machine (%%)")
+    parser.add_argument("--max-memory", type=float, help="Différer les démarrages au-delà de cette occupation mémoire de la machine (%%)")
+    parser.add_argument("--processes", type=int, help="Mode flotte: nombre de processus de travail")
+    parser.add_argument("--restart", action="store_true", help="Mode flotte: ignorer le point de reprise et tout relancer")
+    args = parser.parse_args(argv)
+
+    governor = profile_settings(
+        "low_impact" if args.low_impact else "normal",
+        priority=args.priority,
+        cpu_affinity=args.cpu_affinity,
+        max_cpu_percent=args.max_cpu,
+        max_memory_percent=args.max_memory
+    )
+    stager = Stager(args.staging_dir) if args.stage or args.staging_dir else None
+    cache = None if args.no_cache else ResultCache(args.cache_dir, max_bytes=args.cache_size * 1024**2)
+
+    try:
+        entries = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"Erreur: manifeste invalide: {str(e)}", file=sys.stderr)
+        return 2
+    # Vérifié avant de lancer les outils plutôt qu'à la conversion, une fois l'analyse faite
+    if args.parquet and not columnar_available():
+        print("Erreur: --parquet nécessite pyarrow (pip install pyarrow)", file=sys.stderr)
+        return 2
+
+    all_jobs = []
+    fleet_ok = True
+    try:
+        for entry in entries:
+            if entry.get("roots"):
+                fleet_ok = run_fleet_entry(entry, args.tools_dir, args.processes, args.restart) and fleet_ok
+            else:
+                all_jobs.extend(run_entry(
+                    entry,
+                    tools_dir=args.tools_dir,
+                    max_workers=args.max_workers,
+                    cache=cache,
+                    force=args.force,
+                    hash_contents=args.hash_contents,
+                    timeline=args.timeline,
+                    index=args.index,
+                    parquet=args.parquet,
+                    governor=governor,
+                    package=args.package,
+                    stager=stager,
+                    shard_recmd=args.shard_recmd,
+                    batch_files=args.reb
+                ))
+    except KeyboardInterrupt:
+        print("\nAnalyse annulée", file=sys.stderr)
+        return 130
+
+    if all_jobs:
+        print_summary(all_jobs)
+    return 0 if fleet_ok and all(job.returncode == 0 for job in all_jobs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import csv
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # Dépendance optionnelle: la conversion est simplement indisponible
+    pa = None
+
+
+# Taille des blocs lus dans le CSV (octets) et compression du fichier Parquet
+BLOCK_SIZE = 16 * 1024**2
+COMPRESSION = "zstd"
+
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+
+
+def columnar_available():
+    return pa is not None
+
+
+def columnar_path(csv_file):
+    """Chemin du fichier Parquet associé à un CSV"""
+    return os.path.splitext(str(csv_file))[0] + ".parquet"
+
+
+def _read_header(csv_file):
+    with open(csv_file, newline="", encoding="utf-8-sig", errors="replace") as f:
+        return next(csv.reader(f), [])
+
+
+def _open_reader(csv_file, header, timestamp_columns):
+    column_types = {column: pa.string() for column in header}
+    column_types.update({column: pa.timestamp("ns") for column in timestamp_columns})
+    return pa_csv.open_csv(
+        csv_file,
+        read_options=pa_csv.ReadOptions(block_size=BLOCK_SIZE, encoding="utf8"),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types,
+            timestamp_parsers=[pa_csv.ISO8601, "%m/%d/%Y %H:%M:%S"],
+            strings_can_be_null=False
+        )
+    )
+
+
+def _write_parquet(csv_file, output, header, timestamp_columns):
+    reader = _open_reader(csv_file, header, timestamp_columns)
+    rows = 0
+    with pq.ParquetWriter(output, reader.schema, compression=COMPRESSION) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def convert_csv(csv_file, output=None):
+    """Convertit un CSV d'outil en Parquet compressé, bloc par bloc, sans le charger en mémoire.
+
+    Les colonnes horodatées connues (voir eztools_timeline.PROFILES) sont typées en
+    timestamp; les autres restent du texte. Si un horodatage est illisible, la conversion
+    est refaite avec toutes les colonnes en texte. Retourne un dict avec le chemin produit,
+    les tailles, le ratio et le débit.
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow n'est pas installé: conversion Parquet indisponible")
+
+    from eztools_timeline import detect_profile
+
+    csv_file = str(csv_file)
+    output = output or columnar_path(csv_file)
+    header = _read_header(csv_file)
+    _, profile = detect_profile(header)
+    timestamp_columns = [column for column in profile["timestamps"] if column in header]
+
+    started = time.monotonic()
+    try:
+        rows = _write_parquet(csv_file, output, header, timestamp_columns)
+    except pa.ArrowInvalid:
+        timestamp_columns = []
+        rows = _write_parquet(csv_file, output, header, timestamp_columns)
+    elapsed = time.monotonic() - started
+
+    csv_bytes = os.path.getsize(csv_file)
+    parquet_bytes = os.path.getsize(output)
+    return {
+        "path": output,
+        "rows": rows,
+        "csv_bytes": csv_bytes,
+        "parquet_bytes": parquet_bytes,
+        "ratio": csv_bytes / parquet_bytes if parquet_bytes else 0.0,
+        "seconds": elapsed,
+        "mb_per_second": csv_bytes / 1024**2 / elapsed if elapsed else 0.0,
+        "typed_timestamps": timestamp_columns
+    }
+
+
+def _iter_parquet_records(parquet_file):
+    for batch in parquet_file.iter_batches():
+        columns = {}
+        for name, column in zip(batch.schema.names, batch.columns):
+            if pa.types.is_timestamp(column.type):
+                column = pc.strftime(column, format="%Y-%m-%d %H:%M:%S")
+            columns[name] = column.to_pylist()
+        for values in zip(*columns.values()):
+            yield {name: "" if value is None else value for name, value in zip(columns, values)}
+
+
+@contextmanager
+def open_records(csv_file):
+    """Ouvre les résultats d'un outil: (colonnes, itérateur de lignes sous forme de dicts).
+
+    Lit le fichier Parquet associé s'il existe et est à jour, sinon le CSV.
+    Les horodatages sont rendus en texte, comme dans le CSV.
+    """
+    parquet = columnar_path(csv_file)
+    if pa is not None and os.path.exists(parquet) and os.path.getmtime(parquet) >= os.path.getmtime(csv_file):
+        parquet_file = pq.ParquetFile(parquet)
+        try:
+            yield parquet_file.schema_arrow.names, _iter_parquet_records(parquet_file)
+        finally:
+            parquet_file.close()
+        return
+
+    with open(csv_file, newline="", encoding="utf-8-sig", errors="replace") as f:
+        reader = csv.DictReader(f)
+        yield reader.fieldnames or [], reader
@@ -0,0 +1,916 @@
+import asyncio
+import codecs
+import contextvars
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import psutil
+
+from eztools_cache import cache_key, fingerprint_inputs, is_live_system_path, place_file
+from eztools_telemetry import ProcessTreeSampler, ResourceUsage, measure_outputs
+
+
+# Dossier des outils de Zimmerman, parallèle à ce projet
+DEFAULT_TOOLS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../net6"))
+
+# Registre des outils: exécutable relatif au dossier net6
+TOOLS = {
+    "MFTECmd": {
+        "description": "Analyse MFT",
+        "extensions": [("All files", "*.*")],
+        "executable": "MFTECmd.exe"
+    },
+    "RECmd": {
+        "description": "Analyse Registre",
+        "extensions": [("All files", "*.*")],
+        "executable": "RECmd/RECmd.exe"
+    },
+    "JLECmd": {
+        "description": "Analyse Jump Lists",
+        "extensions": [("All files", "*.*")],
+        "executable": "JLECmd.exe"
+    },
+    "PECmd": {
+        "description": "Analyse Prefetch",
+        "extensions": [("All files", "*.*")],
+        "executable": "PECmd.exe"
+    }
+}
+
+# Dossiers de profils à ignorer lors de la recherche des utilisateurs
+SYSTEM_PROFILES = ["Public", "Default", "Default User", "All Users", "defaultuser0"]
+
+# Sous-dossiers de Recent analysés par JLECmd
+JUMPLIST_FOLDERS = ["CustomDestinations", "AutomaticDestinations"]
+
+# Nom de base des CSV d'un outil dans une entrée du cache de résultats
+CACHE_STEM = "output"
+
+# Tâche en cours d'exécution dans le contexte asyncio courant (voir JobScheduler)
+current_job = contextvars.ContextVar("current_job", default=None)
+
+
+class EngineError(Exception):
+    """Erreur de préparation d'une tâche (outil ou fichier manquant, entrée invalide)"""
+
+
+def evidence_path(root, *parts):
+    """Construit un chemin sous une racine de preuve (lettre de lecteur ou point de montage)"""
+    if len(root) == 2 and root[1] == ":":
+        root += "\\"
+    return os.path.join(root, *parts)
+
+
+def recent_path(root, user):
+    """Dossier Recent d'un utilisateur, qui contient les Jump Lists"""
+    return evidence_path(root, "Users", user, "AppData", "Roaming", "Microsoft", "Windows", "Recent")
+
+
+def users_path(root):
+    """Dossier des profils (Users ou Utilisateurs selon la langue du système)"""
+    path = evidence_path(root, "Users")
+    if os.path.exists(path):
+        return path
+    return evidence_path(root, "Utilisateurs")
+
+
+def find_users(root):
+    """Retourne les profils utilisateurs d'une racine, ou None si le dossier Users est absent"""
+    path = users_path(root)
+    if not os.path.exists(path):
+        return None
+
+    # Lister tous les dossiers dans Users/Utilisateurs sauf les dossiers système
+    users = []
+    for d in sorted(os.listdir(path)):
+        if (os.path.isdir(os.path.join(path, d))
+            and not d.startswith(".")
+            and d not in SYSTEM_PROFILES):
+            users.append(d)
+    return users
+
+
+def list_drives():
+    """Retourne les lecteurs montés (lettres sous Windows, points de montage ailleurs)"""
+    drives = []
+    for part in psutil.disk_partitions():
+        mountpoint = part.mountpoint
+        if len(mountpoint) >= 2 and mountpoint[1] == ":":
+            mountpoint = mountpoint[:2].upper()
+        if mountpoint not in drives:
+            drives.append(mountpoint)
+    return sorted(drives)
+
+
+def partition_report():
+    """Décrit les partitions montées (périphérique, système de fichiers, taille) via psutil"""
+    lines = []
+    for part in psutil.disk_partitions():
+        try:
+            usage = psutil.disk_usage(part.mountpoint)
+            size = f"{usage.total / 1024**3:.2f} Go - Libre: {usage.free / 1024**3:.2f} Go"
+        except OSError:
+            size = "inconnue"
+        lines.append(
+            f"Lecteur: {part.mountpoint} - Périphérique: {part.device}"
+            f" - File system: {part.fstype or 'inconnu'} - Taille: {size}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def physical_disk_report():
+    """Décrit les disques physiques et toutes leurs partitions, y compris celles sans lettre (PowerShell, Windows)"""
+    powershell_script = '''
+    Get-Disk | ForEach-Object {
+        $diskNumber = $_.Number
+        $diskSize = [math]::Round($_.Size / 1GB, 2)
+        $diskType = $_.MediaType
+        
+        Write-Host ("Disque physique #" + $diskNumber + " - Type: " + $diskType + " - Taille: " + $diskSize + " Go")
+
+        Get-Partition -DiskNumber $diskNumber | ForEach-Object {
+            $partition = $_
+            $volume = Get-Volume -Partition $partition
+            $driveLetter = if ($volume.DriveLetter) { $volume.DriveLetter + ":" } else { "Non assigné" }
+            Write-Host ("  Partition " + $partition.PartitionNumber + 
+                        " - Type: " + $partition.Type + 
+                        " - Taille: " + [math]::Round($partition.Size / 1GB, 2) + " Go" +
+                        " - File system: " + $volume.FileSystem +
+                        " - Lecteur: " + $driveLetter)
+        }
+        Write-Host ""
+    }
+    '''
+    return subprocess.check_output(["powershell", "-Command", powershell_script],
+                                   universal_newlines=True,
+                                   stderr=subprocess.STDOUT)
+
+
+class DiscoveryCache:
+    """Cache des résultats de découverte (lecteurs, partitions, utilisateurs) avec durée de validité"""
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """Retourne la valeur en cache si elle est encore valide, sinon appelle loader()"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                return entry[1]
+
+        value = loader()
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+        return value
+
+    def invalidate(self, key=None):
+        """Oublie une entrée, ou tout le cache si key est None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+# Fichiers d'un dossier de ruches que RECmd ne traite pas comme des ruches (journaux de transactions)
+HIVE_LOG_SUFFIXES = (".log", ".log1", ".log2", ".blf", ".regtrans-ms", ".sav")
+
+
+def find_hives(directory):
+    """Ruches (en-tête 'regf') sous un dossier, récursivement et en ordre stable, comme RECmd -d"""
+    hives = []
+    for current, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(HIVE_LOG_SUFFIXES):
+                continue
+            path = os.path.join(current, name)
+            try:
+                with open(path, "rb") as f:
+                    if f.read(4) == b"regf":
+                        hives.append(path)
+            except OSError:
+                continue
+    return hives
+
+
+def merge_csv_files(csv_files, output_file):
+    """Concatène des CSV de même en-tête en un seul (en-tête écrit une fois). Retourne le nombre de fichiers fusionnés"""
+    header = None
+    merged = 0
+    with open(output_file, "wb") as out:
+        for csv_file in csv_files:
+            with open(csv_file, "rb") as f:
+                first = f.readline()
+                if header is None:
+                    header = first
+                    out.write(first)
+                elif first.lstrip(codecs.BOM_UTF8) != header.lstrip(codecs.BOM_UTF8):
+                    raise EngineError(f"En-tête différent dans {csv_file}, fusion impossible")
+                last = first
+                while block := f.read(1024 * 1024):
+                    out.write(block)
+                    last = block
+                if last and not last.endswith(b"\n"):
+                    out.write(b"\n")
+            merged += 1
+    return merged
+
+
+def csv_snapshot(directory):
+    """État (taille, date de modification) des CSV d'un dossier: {chemin: (taille, date)}"""
+    snapshot = {}
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.lower().endswith(".csv"):
+                    st = entry.stat()
+                    snapshot[entry.path] = (st.st_size, st.st_mtime_ns)
+    except OSError:
+        pass
+    return snapshot
+
+
+def new_csv_files(directory, before, prefix=""):
+    """CSV d'un dossier (commençant par prefix) créés ou modifiés depuis le relevé before"""
+    return sorted(
+        path for path, state in csv_snapshot(directory).items()
+        if os.path.basename(path).startswith(prefix) and before.get(path) != state
+    )
+
+
+def format_command(argv):
+    """Représentation lisible d'une commande pour la console"""
+    return subprocess.list2cmdline([str(arg) for arg in argv])
+
+
+@dataclass
+class OutputLine:
+    """Ligne produite par un processus, avec son flux d'origine et son heure de réception"""
+    stream: str
+    text: str
+    timestamp: float
+
+
+@dataclass
+class ProcessResult:
+    """Résultat d'un processus exécuté par run_process"""
+    process: object
+    returncode: int
+    duration: float
+    stdout_bytes: int
+    stderr_bytes: int
+
+
+async def _pump_stream(stream, name, on_line):
+    """Lit un flux par blocs, le découpe en lignes et retourne le nombre d'octets lus"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    nbytes = 0
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            break
+        nbytes += len(chunk)
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            on_line(OutputLine(name, line + "\n", time.time()))
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        on_line(OutputLine(name, pending + "\n", time.time()))
+    return nbytes
+
+
+async def run_process(argv, on_line, on_start=None, on_closed=None):
+    """Exécute une commande en lisant stdout et stderr en parallèle.
+
+    Chaque ligne est transmise à on_line sous forme d'OutputLine, dès sa réception,
+    pour éviter qu'un flux plein ne bloque l'outil. on_closed(process) est appelé quand
+    les deux flux sont fermés, avant d'attendre la fin du processus.
+    """
+    started = time.monotonic()
+    process = await asyncio.create_subprocess_exec(
+        *[str(arg) for arg in argv],
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    if on_start:
+        on_start(process)
+
+    stdout_bytes, stderr_bytes = await asyncio.gather(
+        _pump_stream(process.stdout, "stdout", on_line),
+        _pump_stream(process.stderr, "stderr", on_line)
+    )
+    if on_closed:
+        on_closed(process)
+    returncode = await process.wait()
+
+    return ProcessResult(
+        process=process,
+        returncode=returncode,
+        duration=time.monotonic() - started,
+        stdout_bytes=stdout_bytes,
+        stderr_bytes=stderr_bytes
+    )
+
+
+def kill_process_tree(pid):
+    """Termine un processus et tous ses descendants"""
+    try:
+        parent = psutil.Process(pid)
+    except psutil.NoSuchProcess:
+        return
+    processes = parent.children(recursive=True) + [parent]
+    for proc in processes:
+        try:
+            proc.terminate()
+        except psutil.NoSuchProcess:
+            pass
+    _, alive = psutil.wait_procs(processes, timeout=3)
+    for proc in alive:
+        try:
+            proc.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+
+class ToolRunner:
+    """Exécute les commandes des tâches et relaie leur sortie.
+
+    Par défaut la sortie est écrite sur stdout et les fichiers produits sont
+    collectés dans output_files; l'interface graphique redéfinit write et open_file.
+    """
+
+    def __init__(self):
+        # Processus en cours; le verrou les protège de cancel(), appelé depuis un autre thread
+        self.processes = set()
+        self._processes_lock = threading.Lock()
+        self.jobs = []
+        self.output_files = []
+        self.cancelled = threading.Event()
+        # Gouverneur de ressources optionnel (eztools_governor.Governor)
+        self.governor = None
+
+    def write(self, text):
+        """Affiche du texte produit par une tâche"""
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    def open_file(self, path):
+        """Signale un fichier de résultats produit par une tâche"""
+        self.output_files.append(path)
+
+    def report_output(self, path):
+        """Rattache un fichier de résultats à la tâche en cours puis le signale avec open_file"""
+        job = current_job.get()
+        if job is not None:
+            job.outputs.append(str(path))
+        self.open_file(path)
+
+    def run(self, jobs, max_workers=None):
+        """Exécute des tâches jusqu'à leur fin (bloquant)"""
+        self.cancelled.clear()
+        asyncio.run(JobScheduler(max_workers).run(self, jobs))
+        return jobs
+
+    async def run_command(self, argv, prefix=""):
+        """Exécute une commande et relaie sa sortie. Retourne le code de sortie, ou None si annulé"""
+        if self.cancelled.is_set():
+            return None
+
+        def on_line(line):
+            if line.stream == "stderr":
+                self.write(f"{prefix}Erreurs: {line.text}")
+            else:
+                self.write(f"{prefix}{line.text}")
+
+        # Consommation de l'arbre de processus, cumulée dans la tâche en cours
+        job = current_job.get()
+        samplers = []
+        if job is not None:
+            job.commands.append([str(arg) for arg in argv])
+
+        def on_start(process):
+            with self._processes_lock:
+                cancelled = self.cancelled.is_set()
+                if not cancelled:
+                    self.processes.add(process)
+            if cancelled:
+                # Démarré pendant l'annulation: cancel() ne l'a pas vu, il est terminé ici
+                threading.Thread(target=kill_process_tree, args=(process.pid,), daemon=True).start()
+                return
+            if self.governor is not None:
+                self.governor.apply(process.pid)
+            if job is not None:
+                sampler = ProcessTreeSampler(process.pid, job.usage)
+                samplers.append((sampler, asyncio.create_task(sampler.run())))
+
+        def on_closed(process):
+            # Dernier échantillon tant que le processus est encore visible (pas encore attendu)
+            for sampler, _ in samplers:
+                sampler.sample()
+
+        try:
+            result = await run_process(argv, on_line, on_start=on_start, on_closed=on_closed)
+        finally:
+            for sampler, task in samplers:
+                task.cancel()
+                sampler.stop()
+        with self._processes_lock:
+            self.processes.discard(result.process)
+
+        if self.cancelled.is_set():
+            self.write(f"\n{prefix}Analyse annulée\n")
+            return None
+        return result.returncode
+
+    def cancel(self, wait=False):
+        """Annule l'analyse et termine les arbres de processus en cours.
+
+        Peut être appelé depuis n'importe quel thread. Les processus sont terminés dans un
+        thread à part (jusqu'à 3 s d'attente par arbre): l'appelant n'attend que si wait.
+        """
+        with self._processes_lock:
+            self.cancelled.set()
+            pids = [process.pid for process in self.processes]
+        thread = threading.Thread(target=lambda: [kill_process_tree(pid) for pid in pids], daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+
+
+class Job:
+    """Tâche d'analyse d'un outil, avec son statut, sa durée et son code de sortie"""
+
+    def __init__(self, name, action):
+        self.name = name
+        self.action = action  # coroutine action(runner) retournant le code de sortie
+        self.prepare = None  # coroutine prepare(runner) optionnelle, exécutée avant de prendre une place
+        self.status = "En attente"
+        self.started = None
+        self.finished = None
+        self.returncode = None
+        self.started_at = None
+        # Outil, entrées et lignes de commande exécutées (pour le paquet de preuves)
+        self.tool = None
+        self.inputs = []
+        self.staged_inputs = {}  # entrée -> copie locale analysée à sa place (voir eztools_staging)
+        self.staged_digests = {}  # fichier copié pendant la session -> SHA-256 des octets de l'original
+        self.commands = []
+        # Pré-analyse des entrées et durée estimée (voir eztools_preflight)
+        self.input_files = None
+        self.input_bytes = None
+        self.estimate = None
+        # Mesures: ressources des processus lancés et fichiers produits
+        self.usage = ResourceUsage()
+        self.outputs = []
+        self.output_rows = None
+        self.output_bytes = None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+
+class JobScheduler:
+    """Exécute des tâches en parallèle en limitant le nombre de tâches simultanées.
+
+    Les tâches dont la durée estimée est la plus longue démarrent en premier.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    async def run(self, runner, jobs):
+        runner.jobs = jobs
+        semaphore = asyncio.Semaphore(self.max_workers)
+        started = time.monotonic()
+        # Le sémaphore sert les tâches dans l'ordre où elles l'attendent
+        ordered = sorted(jobs, key=lambda job: job.estimate or 0.0, reverse=True)
+        await asyncio.gather(*(self._run_job(runner, job, semaphore) for job in ordered))
+        if len(jobs) > 1:
+            runner.write(f"\n{len(jobs)} tâches terminées en {time.monotonic() - started:.1f} s\n")
+
+    async def _run_job(self, runner, job, semaphore):
+        current_job.set(job)
+        if job.prepare is not None:
+            # Préparation (copie locale des entrées) hors des places d'exécution des outils
+            job.status = "Copie"
+            try:
+                await job.prepare(runner)
+            except Exception as e:
+                runner.write(f"[{job.name}] Erreur: {str(e)}\n")
+                job.status = "Erreur"
+                return
+            job.status = "En attente"
+
+        async with semaphore:
+            if runner.governor is not None:
+                await runner.governor.wait_for_capacity(runner, job.name)
+            if runner.cancelled.is_set():
+                job.status = "Annulé"
+                return
+
+            job.status = "En cours"
+            job.started = time.monotonic()
+            job.started_at = datetime.now().isoformat(timespec="seconds")
+            try:
+                job.returncode = await job.action(runner)
+            except Exception as e:
+                runner.write(f"[{job.name}] Erreur: {str(e)}\n")
+                job.status = "Erreur"
+            else:
+                if job.returncode is None:
+                    job.status = "Annulé"
+                elif job.returncode == 0:
+                    job.status = "Terminé"
+                else:
+                    job.status = "Erreur"
+            finally:
+                job.finished = time.monotonic()
+            if job.outputs:
+                job.output_rows, job.output_bytes = await asyncio.to_thread(measure_outputs, job.outputs)
+
+
+class Engine:
+    """Construit et exécute les tâches des outils EZ, sans dépendre de l'interface"""
+
+    def __init__(self, tools_dir=None, cache=None, hash_contents=False):
+        self.tools_dir = os.path.abspath(tools_dir or DEFAULT_TOOLS_DIR)
+        self.tools = {
+            name: dict(info, command=os.path.join(self.tools_dir, info["executable"]))
+            for name, info in TOOLS.items()
+        }
+        self.reb_path = os.path.join(self.tools_dir, "RECmd", "BatchExamples", "CTL.reb")
+        # Cache de résultats (ResultCache) optionnel; force relance les outils même sur un succès de cache
+        self.cache = cache
+        self.hash_contents = hash_contents
+        self.force = False
+        # Copie locale des entrées avant analyse (eztools_staging.Stager), optionnelle
+        self.stager = None
+        # RECmd en mode partitionné: un processus par ruche (et par fichier .reb), résultats fusionnés
+        self.shard_recmd = False
+        self.recmd_batch_files = None  # fichiers .reb (CTL.reb par défaut)
+        self.shard_workers = None  # processus RECmd simultanés (nombre de processeurs par défaut)
+
+    def default_input_path(self, root, tool, user=None):
+        """Retourne le chemin d'entrée par défaut d'un outil, ou None s'il n'y en a pas"""
+        if tool == "MFTECmd":
+            return evidence_path(root, "$MFT")
+        if tool == "PECmd":
+            return evidence_path(root, "Windows", "Prefetch")
+        if tool == "RECmd":
+            return evidence_path(root, "Windows", "System32", "config")
+        if tool == "JLECmd" and user:
+            paths = [os.path.join(recent_path(root, user), d) for d in JUMPLIST_FOLDERS]
+            return ";".join(p for p in paths if os.path.exists(p)) or None
+        return None
+
+    def analysis_args(self, tool, input_path):
+        """Arguments d'analyse d'un outil, sans les options de sortie"""
+        command = [
+            self.tools[tool]["command"],
+            "-f" if tool == "MFTECmd" else "-d",
+            input_path
+        ]
+        if tool == "RECmd":
+            if not os.path.exists(self.reb_path):
+                raise EngineError(f"Fichier .reb non trouvé à {self.reb_path}")
+            command.extend(["--bn", self.reb_path])
+        return command
+
+    def build_command(self, tool, input_path, output_dir, output_name=None):
+        """Construit la ligne de commande d'un outil sous forme de liste d'arguments.
+
+        --csv désigne le dossier de sortie; --csvf, s'il est donné, le nom du fichier CSV.
+        """
+        command = self.analysis_args(tool, input_path) + ["--csv", output_dir]
+        if output_name:
+            command.extend(["--csvf", output_name])
+        return command
+
+    def build_file_command(self, tool, input_file, output_dir, output_name):
+        """Ligne de commande d'un outil sur un seul fichier (-f), pour les analyses incrémentales"""
+        return [self.tools[tool]["command"], "-f", input_file, "--csv", output_dir, "--csvf", output_name]
+
+    def build_job(self, tool, input_path, output_path, output_name, job_name=None):
+        """Prépare la tâche d'un outil. Lève EngineError si elle ne peut pas être lancée"""
+        if tool not in self.tools:
+            raise EngineError(f"Outil inconnu: {tool}")
+
+        if tool == "JLECmd":
+            # Créer le dossier de sortie avec le nom choisi par l'utilisateur
+            output_dir = os.path.join(output_path, output_name)
+            os.makedirs(output_dir, exist_ok=True)
+
+            # Séparer les chemins: chaque dossier est traité par une passe parallèle
+            paths = input_path.split(";")
+            force = self.force
+            staged = {path: path for path in paths}
+            job = Job(job_name or tool, lambda runner: self._run_jlecmd(runner, [staged[p] for p in paths], output_dir, force))
+            job.tool, job.inputs = tool, paths
+            job.prepare = self._stage_inputs(staged)
+            return job
+
+        # Pour les autres outils
+        output_file = Path(output_path) / output_name
+        # Construite ici pour signaler tout de suite une commande impossible (fichier .reb manquant);
+        # la commande exécutée est reconstruite au lancement, sur la copie locale éventuelle
+        self.build_command(tool, input_path, output_path, output_name)
+        force = self.force
+        staged = {input_path: input_path}
+        if tool == "RECmd" and self.shard_recmd:
+            batch_files = list(self.recmd_batch_files or [self.reb_path])
+            for batch_file in batch_files:
+                if not os.path.exists(batch_file):
+                    raise EngineError(f"Fichier .reb non trouvé à {batch_file}")
+            job = Job(job_name or tool, lambda runner: self._run_recmd_sharded(
+                runner, staged[input_path], batch_files, output_path, output_file, force
+            ))
+        else:
+            job = Job(job_name or tool, lambda runner: self._run_tool(
+                runner, tool, self.build_command(tool, staged[input_path], output_path, output_name), output_file, force
+            ))
+        job.tool, job.inputs = tool, [input_path]
+        job.prepare = self._stage_inputs(staged)
+        return job
+
+    def _stage_inputs(self, staged):
+        """Préparation d'une tâche qui remplace, dans staged, chaque entrée par sa copie locale.
+
+        Retourne None sans copie locale configurée: l'outil lit alors directement les originaux.
+        """
+        stager = self.stager
+        if stager is None:
+            return None
+
+        async def prepare(runner):
+            job = current_job.get()
+            for path in list(staged):
+                staged[path] = await stager.stage(path, runner, priority=job.input_bytes or 0)
+                if staged[path] != path:
+                    job.staged_inputs[path] = staged[path]
+                    prefix = os.path.abspath(staged[path])
+                    job.staged_digests.update(
+                        (file_path, digest) for file_path, digest in stager.digests.items()
+                        if file_path == prefix or file_path.startswith(prefix + os.sep)
+                    )
+        return prepare
+
+    def build_jobs(self, root, tools, output_path, users=None, on_skip=None):
+        """Prépare une tâche par outil avec ses entrées par défaut sur une racine.
+
+        JLECmd reçoit une tâche par utilisateur. Les outils sans entrée ou impossibles
+        à préparer sont signalés à on_skip(tool, raison) et ignorés.
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        jobs = []
+        for tool in tools:
+            if tool == "JLECmd":
+                if not users:
+                    if on_skip:
+                        on_skip(tool, "aucun utilisateur sélectionné")
+                    continue
+                targets = [(user, tool if len(users) == 1 else f"{tool} ({user})") for user in users]
+            else:
+                targets = [(None, tool)]
+
+            for user, job_name in targets:
+                input_path = self.default_input_path(root, tool, user)
+                if not input_path:
+                    if on_skip:
+                        on_skip(job_name, "aucune entrée trouvée")
+                    continue
+
+                if tool == "JLECmd":
+                    suffix = f"_{user}" if len(users) > 1 else ""
+                    output_name = f"{tool}{suffix}_{timestamp}"
+                else:
+                    output_name = f"{tool}_{timestamp}.csv"
+
+                try:
+                    jobs.append(self.build_job(tool, input_path, output_path, output_name, job_name))
+                except EngineError as e:
+                    if on_skip:
+                        on_skip(job_name, str(e))
+        return jobs
+
+    async def _cache_key(self, runner, tool, command):
+        """Clé de cache d'une commande, ou None si le cache est désactivé ou les entrées illisibles.
+
+        L'empreinte couvre l'entrée de l'outil, son exécutable et, pour RECmd, le fichier .reb;
+        les options de sortie changent à chaque exécution et ne font pas partie de la clé.
+        Le cache n'est pas utilisé pour le volume système en cours d'utilisation.
+        """
+        if self.cache is None:
+            return None
+        job = current_job.get()
+        # Les entrées d'origine: la commande peut désigner leur copie locale
+        if any(is_live_system_path(path) for path in (job.inputs if job else command[2:3])):
+            runner.write(f"[{tool}] Volume système en cours d'utilisation, cache ignoré\n")
+            return None
+        args = command[:command.index("--csv")]
+        inputs = [args[0], args[2]] + [args[i + 1] for i, arg in enumerate(args[:-1]) if arg == "--bn"]
+        try:
+            fingerprint = await asyncio.to_thread(fingerprint_inputs, inputs, self.hash_contents)
+        except OSError:
+            return None
+        return cache_key(tool, args, fingerprint)
+
+    async def _run_jlecmd(self, runner, paths, output_dir, force=False):
+        """Exécute JLECmd en parallèle sur chaque dossier de Jump Lists"""
+        results = await asyncio.gather(*(self._run_jlecmd_pass(runner, path, output_dir, force) for path in paths))
+
+        if any(returncode is None for returncode, _ in results):
+            return None
+        for returncode, _ in results:
+            if returncode != 0:
+                return returncode
+
+        runner.write("\n[JLECmd] Analyse terminée avec succès\n")
+        runner.write(f"Fichiers créés dans : {output_dir}\n")
+
+        # Ouvrir chaque fichier CSV avec TimelineExplorer
+        for _, csv_files in results:
+            for csv_file in csv_files:
+                runner.report_output(csv_file)
+        return 0
+
+    async def _run_jlecmd_pass(self, runner, path, output_dir, force=False):
+        """Exécute une passe JLECmd et retourne (code de sortie, fichiers CSV produits).
+
+        Chaque passe écrit dans son propre sous-dossier, relevé avant l'exécution: seuls les
+        CSV créés ou modifiés par la passe sont retenus, pas ceux laissés par une analyse
+        précédente vers le même dossier de sortie.
+        """
+        pass_dir = os.path.join(output_dir, os.path.basename(os.path.normpath(path)))
+        os.makedirs(pass_dir, exist_ok=True)
+        runner.write(f"\nTraitement du dossier: {path}\n")
+
+        command = self.build_command("JLECmd", path, pass_dir)
+
+        key = await self._cache_key(runner, "JLECmd", command)
+        cached = self.cache.lookup(key) if key and not force else None
+        if cached:
+            csv_files = [os.path.join(pass_dir, os.path.basename(f)) for f in cached]
+            for source, destination in zip(cached, csv_files):
+                place_file(source, destination)
+            runner.write(f"[JLECmd] Entrées inchangées, résultat en cache réutilisé pour {path}\n")
+            return 0, csv_files
+
+        before = await asyncio.to_thread(csv_snapshot, pass_dir)
+        runner.write(f"Exécution: {format_command(command)}\n")
+
+        returncode = await runner.run_command(command, prefix="[JLECmd] ")
+        if returncode is None:
+            return None, []
+
+        if returncode != 0:
+            runner.write(f"\n[JLECmd] Erreur lors de l'exécution sur {path} (code {returncode})\n")
+            return returncode, []
+
+        csv_files = await asyncio.to_thread(new_csv_files, pass_dir, before)
+        if key and csv_files:
+            await asyncio.to_thread(self.cache.store, key, csv_files)
+        return returncode, csv_files
+
+    async def _run_recmd_sharded(self, runner, input_dir, batch_files, output_dir, output_file, force=False):
+        """Exécute RECmd ruche par ruche (et fichier .reb par fichier .reb) en parallèle puis
+        fusionne les CSV des partitions, dans l'ordre des ruches, en output_file.
+
+        Les partitions sont écrites dans un dossier <output_file>_shards, supprimé après la
+        fusion et conservé en cas d'erreur.
+        """
+        # Même clé de cache que l'exécution en un seul processus quand seul CTL.reb est utilisé
+        key_command = [self.tools["RECmd"]["command"], "-d", input_dir]
+        for batch_file in batch_files:
+            key_command.extend(["--bn", batch_file])
+        key_command.extend(["--csv", output_dir])
+
+        key = await self._cache_key(runner, "RECmd", key_command)
+        cached = self.cache.lookup(key) if key and not force else None
+        if cached:
+            placed = await asyncio.to_thread(self._place_cached, cached, output_file)
+            runner.write("[RECmd] Entrées inchangées, résultat en cache réutilisé\n")
+            for csv_file in placed:
+                runner.write(f"Fichier créé : {csv_file}\n")
+                runner.report_output(csv_file)
+            return 0
+
+        hives = await asyncio.to_thread(find_hives, input_dir)
+        if not hives:
+            runner.write(f"[RECmd] Aucune ruche trouvée dans {input_dir}\n")
+            return 1
+
+        shard_dir = f"{output_file}_shards"
+        os.makedirs(shard_dir, exist_ok=True)
+        shards = [(hive, batch_file) for hive in hives for batch_file in batch_files]
+        runner.write(f"[RECmd] {len(hives)} ruche(s), {len(shards)} partition(s)\n")
+        shard_workers = self.shard_workers or os.cpu_count() or 1
+        if runner.governor is not None and runner.governor.settings.max_workers:
+            # Les partitions respectent le nombre de processus simultanés du gouverneur (faible impact: un seul)
+            shard_workers = min(shard_workers, runner.governor.settings.max_workers)
+        semaphore = asyncio.Semaphore(shard_workers)
+
+        async def run_shard(number, hive, batch_file):
+            async with semaphore:
+                if runner.governor is not None:
+                    await runner.governor.wait_for_capacity(runner, f"RECmd {os.path.basename(hive)}")
+                shard_name = f"{number:04d}.csv"
+                command = [self.tools["RECmd"]["command"], "-f", hive, "--bn", batch_file, "--csv", shard_dir, "--csvf", shard_name]
+                runner.write(f"Exécution: {format_command(command)}\n")
+                returncode = await runner.run_command(command, prefix=f"[RECmd {os.path.basename(hive)}] ")
+                return returncode, os.path.join(shard_dir, shard_name)
+
+        results = await asyncio.gather(*(run_shard(number, hive, batch_file) for number, (hive, batch_file) in enumerate(shards)))
+        if any(returncode is None for returncode, _ in results):
+            return None
+        for (returncode, _), (hive, batch_file) in zip(results, shards):
+            if returncode != 0:
+                runner.write(f"\n[RECmd] Erreur sur {hive} avec {os.path.basename(batch_file)} (code {returncode}), partitions conservées dans {shard_dir}\n")
+                return returncode
+
+        # Une ruche sans clé correspondant au fichier .reb ne produit pas de CSV
+        csv_files = [path for _, path in results if os.path.isfile(path)]
+        await asyncio.to_thread(merge_csv_files, csv_files, output_file)
+        shutil.rmtree(shard_dir, ignore_errors=True)
+        if key:
+            await asyncio.to_thread(self._store_outputs, key, [output_file], output_file)
+        runner.write(f"\n[RECmd] Analyse terminée avec succès ({len(csv_files)} partition(s) fusionnée(s))\n")
+        runner.write(f"Fichier créé : {output_file}\n")
+        runner.report_output(output_file)
+        return 0
+
+    def _store_outputs(self, key, csv_files, output_file):
+        """Met en cache les CSV d'une exécution, nommés par rapport au fichier de sortie.
+
+        Un outil peut écrire plusieurs CSV à partir du nom donné par --csvf (PECmd:
+        <nom>.csv et <nom>_Timeline.csv): chacun est gardé sous CACHE_STEM + son suffixe.
+        """
+        stem = os.path.splitext(os.path.basename(output_file))[0]
+        names = [CACHE_STEM + os.path.basename(path)[len(stem):] for path in csv_files]
+        self.cache.store(key, csv_files, names)
+
+    def _place_cached(self, cached, output_file):
+        """Copie les CSV d'une entrée du cache sous le nom du fichier de sortie et retourne les copies"""
+        output_file = Path(output_file)
+        stem = output_file.stem
+        placed = []
+        for path in cached:
+            name = os.path.basename(path)
+            suffix = name[len(CACHE_STEM):] if name.startswith(CACHE_STEM) else output_file.suffix
+            placed.append(str(output_file.with_name(stem + suffix)))
+            place_file(path, placed[-1])
+        return placed
+
+    async def _run_tool(self, runner, tool, command, output_file, force=False):
+        """Exécute un outil produisant un fichier CSV (et ses éventuels CSV annexes)"""
+        key = await self._cache_key(runner, tool, command)
+        cached = self.cache.lookup(key) if key and not force else None
+        if cached:
+            placed = await asyncio.to_thread(self._place_cached, cached, output_file)
+            runner.write(f"[{tool}] Entrées inchangées, résultat en cache réutilisé\n")
+            for csv_file in placed:
+                runner.write(f"Fichier créé : {csv_file}\n")
+                runner.report_output(csv_file)
+            return 0
+
+        output_dir = os.path.dirname(os.path.abspath(output_file))
+        before = await asyncio.to_thread(csv_snapshot, output_dir)
+
+        runner.write(f"Exécution: {format_command(command)}\n")
+
+        returncode = await runner.run_command(command, prefix=f"[{tool}] ")
+        if returncode is None:
+            return None
+
+        if returncode == 0:
+            # Tous les CSV écrits par l'outil à partir du nom de sortie (PECmd: aussi <nom>_Timeline.csv),
+            # et seulement eux, le fichier demandé en premier
+            csv_files = await asyncio.to_thread(new_csv_files, output_dir, before, Path(output_file).stem)
+            if os.path.isfile(output_file):
+                main = os.path.abspath(output_file)
+                csv_files = [main] + [path for path in csv_files if path != main]
+                if key:
+                    await asyncio.to_thread(self._store_outputs, key, csv_files, output_file)
+            runner.write(f"\n[{tool}] Analyse terminée avec succès\n")
+            # Ouvrir les fichiers CSV avec TimelineExplorer
+            for csv_file in csv_files:
+                runner.write(f"Fichier créé : {csv_file}\n")
+                runner.report_output(csv_file)
+        else:
+            runner.write(f"\n[{tool}] Erreur lors de l'exécution (code {returncode})\n")
+        return returncode
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from eztools_core import Engine, EngineError, TOOLS, ToolRunner, find_users
+from eztools_telemetry import job_report
+
+
+CHECKPOINT_NAME = "fleet_checkpoint.json"
+
+
+class FileRunner(ToolRunner):
+    """Runner qui écrit la sortie d'une tâche dans un fichier journal plutôt que sur la console"""
+
+    def __init__(self, log_path):
+        super().__init__()
+        self.log_file = open(log_path, "a", encoding="utf-8", errors="replace")
+
+    def write(self, text):
+        self.log_file.write(text)
+
+    def close(self):
+        self.log_file.close()
+
+
+def root_label(root):
+    """Nom de dossier lisible et unique pour une racine de preuve (E: -> E_xxxxxxxx, /mnt/img01 -> mnt_img01_xxxxxxxx).
+
+    Le nom lisible seul peut être le même pour deux racines (/mnt/a b et /mnt/a_b):
+    il est suivi d'une empreinte courte du chemin complet.
+    """
+    label = re.sub(r"[^A-Za-z0-9._-]+", "_", root).strip("_") or "racine"
+    digest = hashlib.sha1(os.path.normcase(root).encode("utf-8", "surrogatepass")).hexdigest()[:8]
+    return f"{label}_{digest}"
+
+
+def job_key(root, tool, user=None):
+    return f"{root}|{tool}|{user or ''}"
+
+
+def plan_fleet(roots, tools, on_skip=None):
+    """Liste les tâches racine x outil (x utilisateur pour JLECmd) d'une flotte"""
+    engine = Engine()
+    specs = []
+    for root in roots:
+        users = find_users(root) or []
+        for tool in tools:
+            for user in (users if tool == "JLECmd" else [None]):
+                if not engine.default_input_path(root, tool, user):
+                    if on_skip:
+                        on_skip(job_key(root, tool, user), "aucune entrée trouvée")
+                    continue
+                specs.append({"root": root, "tool": tool, "user": user, "key": job_key(root, tool, user)})
+    return specs
+
+
+def run_fleet_job(spec, output_dir, tools_dir=None):
+    """Exécute une tâche de flotte dans un processus de travail et retourne son résultat.
+
+    Les noms de sortie ne contiennent pas d'horodatage: une tâche relancée après
+    une interruption réécrit les mêmes fichiers.
+    """
+    engine = Engine(tools_dir)
+    root, tool, user = spec["root"], spec["tool"], spec["user"]
+    job_dir = os.path.join(output_dir, root_label(root))
+    os.makedirs(job_dir, exist_ok=True)
+    name = f"{tool}_{user}" if user else tool
+
+    result = {"key": spec["key"], "status": "Erreur", "returncode": None, "elapsed": 0.0, "outputs": []}
+    runner = FileRunner(os.path.join(job_dir, f"{name}.log"))
+    try:
+        input_path = engine.default_input_path(root, tool, user)
+        output_name = name if tool == "JLECmd" else f"{name}.csv"
+        job = engine.build_job(tool, input_path, job_dir, output_name, name)
+        runner.run([job], max_workers=1)
+        result.update(status=job.status, returncode=job.returncode, elapsed=job.elapsed, outputs=[str(path) for path in runner.output_files],
+                      telemetry=job_report(job))
+    except EngineError as e:
+        runner.write(f"Erreur: {str(e)}\n")
+    finally:
+        runner.close()
+    return result
+
+
+def load_checkpoint(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_checkpoint(path, checkpoint):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def run_fleet(roots, output_dir, tools=None, tools_dir=None, processes=None, restart=False, write=print):
+    """Traite plusieurs racines de preuve en répartissant les tâches sur un pool de processus.
+
+    Chaque tâche terminée est enregistrée dans fleet_checkpoint.json; une nouvelle
+    exécution saute les tâches déjà réussies (sauf avec restart). Retourne le point de reprise.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint_path = os.path.join(output_dir, CHECKPOINT_NAME)
+    checkpoint = {} if restart else load_checkpoint(checkpoint_path)
+
+    specs = plan_fleet(roots, tools or list(TOOLS), on_skip=lambda key, reason: write(f"{key} ignoré: {reason}"))
+    pending = [spec for spec in specs if checkpoint.get(spec["key"], {}).get("status") != "Terminé"]
+    if len(pending) < len(specs):
+        write(f"Reprise: {len(specs) - len(pending)} tâche(s) déjà terminée(s) sur {len(specs)}")
+
+    started = time.monotonic()
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count() or 1) as executor:
+        futures = {executor.submit(run_fleet_job, spec, output_dir, tools_dir): spec for spec in pending}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                spec = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"key": spec["key"], "status": "Erreur", "returncode": None, "elapsed": 0.0, "outputs": [], "error": str(e)}
+                checkpoint[spec["key"]] = result
+                save_checkpoint(checkpoint_path, checkpoint)
+                write(f"[{done}/{len(pending)}] {spec['key']}: {result['status']} ({result['elapsed']:.1f} s)")
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    write(f"{len(pending)} tâche(s) exécutée(s) en {time.monotonic() - started:.1f} s")
+    return checkpoint
@@ -0,0 +1,119 @@
+import asyncio
+import os
+from dataclasses import dataclass, field, replace
+
+import psutil
+
+
+# Priorités des processus des outils: (classe Windows, valeur nice POSIX)
+PRIORITIES = {
+    "normal": (psutil.NORMAL_PRIORITY_CLASS if os.name == "nt" else None, 0),
+    "low": (psutil.BELOW_NORMAL_PRIORITY_CLASS if os.name == "nt" else None, 10),
+    "idle": (psutil.IDLE_PRIORITY_CLASS if os.name == "nt" else None, 19)
+}
+
+
+@dataclass
+class GovernorSettings:
+    """Réglages du gouverneur de ressources.
+
+    max_cpu_percent et max_memory_percent (charge de la machine, 0 à 100) retardent le
+    démarrage des tâches suivantes tant qu'ils sont dépassés; None désactive le seuil.
+    """
+    priority: str = "normal"
+    cpu_affinity: list = field(default_factory=list)
+    low_io_priority: bool = False
+    max_cpu_percent: float = None
+    max_memory_percent: float = None
+    max_workers: int = None
+    check_interval: float = 1.0
+
+
+# Profils prédéfinis; "low_impact" pour les analyses à chaud sur un serveur en production
+PROFILES = {
+    "normal": GovernorSettings(),
+    "low_impact": GovernorSettings(
+        priority="idle",
+        low_io_priority=True,
+        max_cpu_percent=60,
+        max_memory_percent=80,
+        max_workers=1
+    )
+}
+
+
+def profile_settings(name, **overrides):
+    """Réglages d'un profil, avec les valeurs non nulles de overrides à la place des siennes"""
+    return replace(PROFILES[name], **{key: value for key, value in overrides.items() if value is not None})
+
+
+def parse_affinity(text):
+    """'0,2-3' -> [0, 2, 3]"""
+    cpus = []
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        start, _, end = part.partition("-")
+        cpus.extend(range(int(start), int(end or start) + 1))
+    return cpus
+
+
+class Governor:
+    """Limite l'impact des outils sur la machine analysée.
+
+    apply() règle la priorité CPU et disque et l'affinité d'un processus lancé (ses enfants
+    en héritent); wait_for_capacity() retarde le démarrage d'une tâche tant que la charge CPU
+    ou mémoire de la machine dépasse les seuils.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or GovernorSettings()
+        self._lock = None
+
+    def apply(self, pid):
+        settings = self.settings
+        try:
+            proc = psutil.Process(pid)
+            if settings.priority != "normal":
+                priority_class, niceness = PRIORITIES[settings.priority]
+                proc.nice(priority_class if os.name == "nt" else niceness)
+            if settings.low_io_priority and hasattr(proc, "ionice"):
+                proc.ionice(psutil.IOPRIO_LOW if os.name == "nt" else psutil.IOPRIO_CLASS_IDLE)
+            if settings.cpu_affinity and hasattr(proc, "cpu_affinity"):
+                proc.cpu_affinity(settings.cpu_affinity)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, ValueError):
+            pass
+
+    def pressure(self, cpu_percent):
+        """Raison de retarder un démarrage, ou None si la machine a de la marge"""
+        settings = self.settings
+        if settings.max_cpu_percent is not None and cpu_percent > settings.max_cpu_percent:
+            return f"CPU {cpu_percent:.0f} % > {settings.max_cpu_percent:.0f} %"
+        if settings.max_memory_percent is not None:
+            memory_percent = psutil.virtual_memory().percent
+            if memory_percent > settings.max_memory_percent:
+                return f"mémoire {memory_percent:.0f} % > {settings.max_memory_percent:.0f} %"
+        return None
+
+    async def wait_for_capacity(self, runner, job_name):
+        """Attend que la charge de la machine repasse sous les seuils avant de démarrer une tâche.
+
+        Les démarrages passent un par un: chaque tâche lancée est prise en compte dans la
+        mesure suivante au lieu que toutes démarrent sur la même mesure.
+        """
+        settings = self.settings
+        if settings.max_cpu_percent is None and settings.max_memory_percent is None:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            waiting = False
+            while not runner.cancelled.is_set():
+                cpu_percent = await asyncio.to_thread(psutil.cpu_percent, settings.check_interval)
+                reason = self.pressure(cpu_percent)
+                if reason is None:
+                    break
+                if not waiting:
+                    runner.write(f"[{job_name}] Démarrage différé: {reason}\n")
+                    waiting = True
+            if waiting and not runner.cancelled.is_set():
+                runner.write(f"[{job_name}] Charge revenue sous les seuils, démarrage\n")
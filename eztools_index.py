@@ -0,0 +1,217 @@
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+
+from eztools_columnar import open_records
+from eztools_timeline import detect_profile, normalize_timestamp
+
+
+INDEX_NAME = "eztools_index.sqlite"
+# Nombre de lignes insérées par transaction lors du chargement
+BATCH_ROWS = 50_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE,
+    tool TEXT,
+    size INTEGER,
+    mtime REAL,
+    rows INTEGER
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER,
+    tool TEXT,
+    description TEXT,
+    details TEXT
+);
+CREATE TABLE IF NOT EXISTS timestamps (
+    entry_id INTEGER,
+    timestamp TEXT,
+    kind TEXT
+);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS timestamps_timestamp ON timestamps(timestamp);
+CREATE INDEX IF NOT EXISTS timestamps_entry ON timestamps(entry_id);
+CREATE INDEX IF NOT EXISTS entries_source ON entries(source_id);
+"""
+
+
+def index_path(output_dir):
+    """Chemin de l'index SQLite d'un dossier de résultats"""
+    return os.path.join(output_dir, INDEX_NAME)
+
+
+def connect(db_path):
+    """Ouvre l'index et crée son schéma (table plein texte FTS5 sur les chemins et noms)"""
+    connection = sqlite3.connect(db_path)
+    connection.executescript(SCHEMA)
+    connection.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5("
+        "description, details, content='entries', content_rowid='id')"
+    )
+    return connection
+
+
+def _remove_source(connection, source_id):
+    connection.execute(
+        "INSERT INTO entries_fts(entries_fts, rowid, description, details) "
+        "SELECT 'delete', id, description, details FROM entries WHERE source_id = ?",
+        (source_id,)
+    )
+    connection.execute("DELETE FROM timestamps WHERE entry_id IN (SELECT id FROM entries WHERE source_id = ?)", (source_id,))
+    connection.execute("DELETE FROM entries WHERE source_id = ?", (source_id,))
+    connection.execute("DELETE FROM sources WHERE id = ?", (source_id,))
+
+
+def index_csv(db_path, csv_file):
+    """Charge un CSV d'outil dans l'index. Retourne le nombre de lignes chargées (0 s'il était à jour).
+
+    Le fichier Parquet associé au CSV est lu à sa place s'il existe (voir eztools_columnar).
+    """
+    csv_file = os.path.abspath(csv_file)
+    st = os.stat(csv_file)
+    connection = connect(db_path)
+    try:
+        row = connection.execute("SELECT id, size, mtime FROM sources WHERE path = ?", (csv_file,)).fetchone()
+        if row and row[1] == st.st_size and row[2] == st.st_mtime:
+            return 0
+
+        # Chargement en masse: pas de synchronisation disque avant la fin
+        connection.execute("PRAGMA synchronous = OFF")
+        with connection:
+            if row:
+                _remove_source(connection, row[0])
+
+            with open_records(csv_file) as (fieldnames, records):
+                tool, profile = detect_profile(fieldnames)
+                columns = [column for column in profile["timestamps"] if column in fieldnames]
+                source_id = connection.execute(
+                    "INSERT INTO sources (path, tool, size, mtime) VALUES (?, ?, ?, ?)",
+                    (csv_file, tool, st.st_size, st.st_mtime)
+                ).lastrowid
+
+                entry_id = (connection.execute("SELECT MAX(id) FROM entries").fetchone()[0] or 0)
+                first_id = entry_id + 1
+                entries = []
+                timestamps = []
+                count = 0
+                for record in records:
+                    entry_id += 1
+                    entries.append((entry_id, source_id, tool, profile["description"](record), profile["details"](record)))
+                    for column in columns:
+                        timestamp = normalize_timestamp(record.get(column))
+                        if timestamp is not None:
+                            timestamps.append((entry_id, timestamp, column))
+                    if len(entries) >= BATCH_ROWS:
+                        count += _flush(connection, entries, timestamps)
+                count += _flush(connection, entries, timestamps)
+
+            connection.execute(
+                "INSERT INTO entries_fts(rowid, description, details) "
+                "SELECT id, description, details FROM entries WHERE id >= ?",
+                (first_id,)
+            )
+            connection.execute("UPDATE sources SET rows = ? WHERE id = ?", (count, source_id))
+            # Index B-tree créés après le premier chargement, puis maintenus par SQLite
+            connection.executescript(INDEXES)
+        return count
+    finally:
+        connection.close()
+
+
+def _flush(connection, entries, timestamps):
+    count = len(entries)
+    connection.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?)", entries)
+    connection.executemany("INSERT INTO timestamps VALUES (?, ?, ?)", timestamps)
+    entries.clear()
+    timestamps.clear()
+    return count
+
+
+def fts_query(keyword):
+    """Transforme une saisie libre en requête FTS5 (chaque mot cherché comme préfixe)"""
+    terms = keyword.split()
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+
+def search(db_path, keyword=None, start=None, end=None, tool=None, page=0, page_size=100):
+    """Recherche par mot-clé et/ou plage de dates; retourne une page de résultats triés par date.
+
+    Chaque résultat est (Timestamp, TimestampType, Tool, Description, Details, SourceFile).
+    start et end sont comparés au format 'AAAA-MM-JJ HH:MM:SS' (un préfixe comme '2024-03' suffit).
+    """
+    clauses = []
+    params = []
+    if keyword:
+        clauses.append("t.entry_id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)")
+        params.append(fts_query(keyword))
+    if start:
+        clauses.append("t.timestamp >= ?")
+        params.append(start)
+    if end:
+        # Borne incluse: '2024-03' couvre tout le mois de mars
+        clauses.append("t.timestamp <= ?")
+        params.append(end + "\uffff")
+    if tool:
+        clauses.append("e.tool = ?")
+        params.append(tool)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    query = f"""
+        SELECT t.timestamp, t.kind, e.tool, e.description, e.details, s.path
+        FROM timestamps t
+        JOIN entries e ON e.id = t.entry_id
+        JOIN sources s ON s.id = e.source_id
+        {where}
+        ORDER BY t.timestamp
+        LIMIT ? OFFSET ?
+    """
+    params.extend([page_size, page * page_size])
+
+    connection = sqlite3.connect(db_path)
+    try:
+        return connection.execute(query, params).fetchall()
+    finally:
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Indexe les CSV des outils EZ et y recherche des événements")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = subparsers.add_parser("index", help="Charger des CSV dans l'index")
+    index_parser.add_argument("db", help="Fichier d'index SQLite")
+    index_parser.add_argument("csv_files", nargs="+")
+
+    search_parser = subparsers.add_parser("search", help="Rechercher dans l'index")
+    search_parser.add_argument("db", help="Fichier d'index SQLite")
+    search_parser.add_argument("keyword", nargs="?", help="Mots recherchés dans les chemins et noms")
+    search_parser.add_argument("--from", dest="start", help="Date de début (AAAA-MM-JJ[ HH:MM:SS])")
+    search_parser.add_argument("--to", dest="end", help="Date de fin incluse")
+    search_parser.add_argument("--tool", help="Limiter à un outil (MFTECmd, PECmd, JLECmd, RECmd...)")
+    search_parser.add_argument("--page", type=int, default=0)
+    search_parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    if args.command == "index":
+        for csv_file in args.csv_files:
+            print(f"{csv_file}: {index_csv(args.db, csv_file)} lignes indexées")
+        return 0
+
+    if not os.path.exists(args.db):
+        print(f"Erreur: index introuvable: {args.db}", file=sys.stderr)
+        return 2
+    writer = csv.writer(sys.stdout)
+    for row in search(args.db, args.keyword, args.start, args.end, args.tool, args.page, args.page_size):
+        writer.writerow(row)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
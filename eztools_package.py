@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import time
+import zipfile
+from datetime import datetime
+
+from eztools_cache import hash_file
+from eztools_telemetry import host_info
+
+
+# Taille des blocs lus dans chaque fichier et niveau de compression de l'archive
+BLOCK_SIZE = 1024 * 1024
+COMPRESS_LEVEL = 6
+
+
+class _HashingWriter:
+    """Fichier d'écriture sans retour arrière qui hache tout ce qui y est écrit.
+
+    zipfile le traite comme un flux non positionnable (descripteurs de données après
+    chaque fichier): l'archive est hachée pendant son écriture, sans la relire.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+        self.position = 0
+
+    def write(self, data):
+        self.digest.update(data)
+        self.position += len(data)
+        return self.f.write(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        self.f.flush()
+
+
+def _expand(path):
+    """Fichiers d'une entrée (fichier ou dossier parcouru récursivement), en ordre stable"""
+    if not os.path.isdir(path):
+        yield path
+        return
+    for directory, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            yield os.path.join(directory, name)
+
+
+def archive_name(path, prefix, base=None):
+    """Nom d'un fichier dans l'archive: relatif à base s'il s'y trouve, sinon chemin complet sans lecteur"""
+    path = os.path.abspath(path)
+    if base and os.path.commonpath([path, os.path.abspath(base)]) == os.path.abspath(base):
+        relative = os.path.relpath(path, base)
+    else:
+        drive, rest = os.path.splitdrive(path)
+        relative = os.path.join(drive.rstrip(":").strip("\\/").replace("\\", "_"), rest.lstrip("\\/"))
+    return "/".join([prefix] + [part for part in relative.replace("\\", "/").split("/") if part])
+
+
+def file_version(path):
+    """Version d'un exécutable Windows (ressource VERSIONINFO), ou None"""
+    if os.name != "nt":
+        return None
+    import ctypes
+    from ctypes import wintypes
+
+    version = ctypes.windll.version
+    size = version.GetFileVersionInfoSizeW(path, None)
+    if not size:
+        return None
+    buffer = ctypes.create_string_buffer(size)
+    if not version.GetFileVersionInfoW(path, 0, size, buffer):
+        return None
+    info = ctypes.c_void_p()
+    length = wintypes.UINT()
+    if not version.VerQueryValueW(buffer, "\\", ctypes.byref(info), ctypes.byref(length)):
+        return None
+    # VS_FIXEDFILEINFO: dwFileVersionMS et dwFileVersionLS aux positions 2 et 3
+    fixed = ctypes.cast(info, ctypes.POINTER(wintypes.DWORD * 13)).contents
+    return f"{fixed[2] >> 16}.{fixed[2] & 0xFFFF}.{fixed[3] >> 16}.{fixed[3] & 0xFFFF}"
+
+
+def tool_info(tools, names):
+    """Chemin, version et SHA-256 des exécutables des outils utilisés"""
+    info = {}
+    for name in sorted(set(names)):
+        path = tools[name]["command"]
+        entry = {"path": path, "version": None, "sha256": None}
+        try:
+            entry["version"] = file_version(path)
+            entry["sha256"] = hash_file(path, BLOCK_SIZE)
+        except OSError as e:
+            entry["error"] = str(e)
+        info[name] = entry
+    return info
+
+
+def _job_input_files(job):
+    """(fichier lu, fichier d'origine, SHA-256 attendu ou None) de chaque entrée d'une tâche.
+
+    Un fichier copié en local pendant la session (job.staged_digests) est lu depuis sa copie,
+    celle que l'outil a analysée, et vérifié avec le SHA-256 des octets de l'original lus lors
+    de la copie. Les copies réutilisées d'une session précédente ne sont pas vérifiables: le
+    fichier d'origine est alors relu. Les fichiers sont ceux de l'original, pas de la copie.
+    """
+    for path in job.inputs:
+        staged = job.staged_inputs.get(path)
+        for file_path in _expand(path):
+            if staged is None:
+                yield file_path, file_path, None
+                continue
+            relative = os.path.relpath(file_path, path)
+            copy = os.path.abspath(staged if relative == "." else os.path.join(staged, relative))
+            expected = job.staged_digests.get(copy)
+            yield (copy, file_path, expected) if expected else (file_path, file_path, None)
+
+
+def _add_file(archive, path, name, include):
+    """Hache un fichier en une lecture, en l'écrivant dans l'archive si include"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as src:
+        if include:
+            with archive.open(name, "w", force_zip64=True) as dst:
+                while block := src.read(BLOCK_SIZE):
+                    digest.update(block)
+                    dst.write(block)
+                    size += len(block)
+        else:
+            while block := src.read(BLOCK_SIZE):
+                digest.update(block)
+                size += len(block)
+    return size, digest.hexdigest()
+
+
+def package_run(archive_path, jobs, tools, output_dir=None, extra_files=(), include_inputs=True, write=print):
+    """Crée le paquet de preuves d'une analyse et retourne le chemin de son manifeste.
+
+    Chaque entrée des outils (jobs[].inputs, lue depuis sa copie locale vérifiée s'il y en a
+    une, voir _job_input_files) et chaque fichier produit (jobs[].outputs et extra_files) est lu une seule fois: le SHA-256 est calculé pendant l'écriture dans
+    l'archive ZIP compressée. Sans include_inputs, les entrées sont hachées mais pas archivées.
+    Le manifeste JSON (empreintes, tailles, versions des outils, lignes de commande) est
+    écrit à côté de l'archive; un fichier illisible y est noté avec son erreur.
+    """
+    # (rôle, fichier lu, fichier d'origine, SHA-256 attendu, nom dans l'archive)
+    files = []
+    seen = set()
+    for job in jobs:
+        files.extend(
+            ("input", read_path, original, expected, archive_name(original, "inputs"))
+            for read_path, original, expected in _job_input_files(job)
+        )
+        files.extend(("output", path, path, None, archive_name(path, "outputs", output_dir)) for path in job.outputs)
+    files.extend(("output", str(path), str(path), None, archive_name(path, "outputs", output_dir)) for path in extra_files)
+    files = [entry for entry in files if not (entry[4] in seen or seen.add(entry[4]))]
+
+    started = time.monotonic()
+    total_bytes = 0
+    records = []
+    with open(archive_path, "wb") as raw:
+        hashing = _HashingWriter(raw)
+        with zipfile.ZipFile(hashing, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=COMPRESS_LEVEL) as archive:
+            for number, (role, path, original, expected, name) in enumerate(files, 1):
+                record = {"role": role, "path": os.path.abspath(original), "archive_name": None, "size": None, "sha256": None}
+                if path != original:
+                    record["read_from"] = os.path.abspath(path)
+                include = include_inputs or role == "output"
+                try:
+                    record["size"], record["sha256"] = _add_file(archive, path, name, include)
+                    record["archive_name"] = name if include else None
+                    if expected:
+                        record["matches_original"] = record["sha256"] == expected
+                        if not record["matches_original"]:
+                            record["error"] = f"copie locale différente de l'original (SHA-256 à la copie {expected})"
+                            write(f"Paquet de preuves: la copie locale de {original} diffère de l'original\n")
+                    total_bytes += record["size"]
+                except OSError as e:
+                    record["error"] = str(e)
+                    write(f"Paquet de preuves: {path} illisible ({str(e)})\n")
+                records.append(record)
+                if number % 100 == 0:
+                    write(f"Paquet de preuves: {number}/{len(files)} fichiers\n")
+        hashing.flush()
+    elapsed = time.monotonic() - started
+
+    manifest = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "host": host_info(),
+        "archive": {
+            "path": os.path.abspath(archive_path),
+            "size": hashing.position,
+            "sha256": hashing.digest.hexdigest(),
+            "compression": f"deflate-{COMPRESS_LEVEL}",
+            "source_bytes": total_bytes,
+            "seconds": round(elapsed, 3)
+        },
+        "tools": tool_info(tools, [job.tool for job in jobs if job.tool]),
+        "jobs": [
+            {
+                "name": job.name,
+                "tool": job.tool,
+                "status": job.status,
+                "returncode": job.returncode,
+                "started_at": job.started_at,
+                "inputs": job.inputs,
+                "staged_inputs": job.staged_inputs,
+                "commands": job.commands,
+                "outputs": job.outputs
+            }
+            for job in jobs
+        ],
+        "files": records
+    }
+    manifest_path = os.path.splitext(archive_path)[0] + ".manifest.json"
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    write(f"Paquet de preuves créé : {archive_path} ({len(records)} fichiers, "
+          f"{total_bytes / 1024**2:.1f} Mo lus en {elapsed:.1f} s)\n")
+    write(f"Manifeste : {manifest_path}\n")
+    return manifest_path
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from eztools_cache import DEFAULT_CACHE_DIR
+
+
+# Historique des débits mesurés, par outil
+DEFAULT_HISTORY_PATH = os.path.join(DEFAULT_CACHE_DIR, "throughput.json")
+
+# Débits (octets/s) et temps de démarrage (s) supposés tant qu'un outil n'a jamais été mesuré
+DEFAULT_THROUGHPUT = {
+    "MFTECmd": {"bytes_per_second": 40 * 1024**2, "startup": 3.0},
+    "RECmd": {"bytes_per_second": 10 * 1024**2, "startup": 5.0},
+    "JLECmd": {"bytes_per_second": 2 * 1024**2, "startup": 2.0},
+    "PECmd": {"bytes_per_second": 2 * 1024**2, "startup": 2.0}
+}
+
+# Poids d'une nouvelle mesure dans la moyenne glissante
+SMOOTHING = 0.3
+# En dessous de cette taille d'entrée, la durée mesurée est surtout du temps de démarrage
+STARTUP_BYTES = 1024**2
+
+
+def scan_path(path, pool=None):
+    """(nombre de fichiers, octets) sous un fichier ou un dossier.
+
+    Avec pool, les sous-dossiers du premier niveau sont parcourus en parallèle.
+    Les entrées illisibles sont ignorées.
+    """
+    try:
+        if not os.path.isdir(path):
+            return 1, os.stat(path).st_size
+    except OSError:
+        return 0, 0
+
+    files = size = 0
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        files += 1
+                        size += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    except OSError:
+        return 0, 0
+
+    results = pool.map(scan_path, subdirs) if pool and len(subdirs) > 1 else map(scan_path, subdirs)
+    for sub_files, sub_size in results:
+        files += sub_files
+        size += sub_size
+    return files, size
+
+
+class ThroughputHistory:
+    """Débits observés par outil (moyennes glissantes), enregistrés en JSON entre les sessions"""
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_HISTORY_PATH
+        self.lock = threading.Lock()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.tools = json.load(f)
+        except (OSError, ValueError):
+            self.tools = {}
+
+    def model(self, tool):
+        return dict(DEFAULT_THROUGHPUT.get(tool, {"bytes_per_second": 10 * 1024**2, "startup": 2.0}), **self.tools.get(tool, {}))
+
+    def estimate(self, tool, input_bytes):
+        """Durée estimée (s) d'un outil sur input_bytes octets d'entrée"""
+        model = self.model(tool)
+        return model["startup"] + input_bytes / model["bytes_per_second"]
+
+    def record(self, jobs):
+        """Met à jour les débits avec les tâches terminées réellement exécutées (hors cache)"""
+        with self.lock:
+            for job in jobs:
+                if job.status != "Terminé" or not job.commands or job.input_bytes is None or not job.tool:
+                    continue
+                model = self.model(job.tool)
+                if job.input_bytes < STARTUP_BYTES:
+                    model["startup"] += SMOOTHING * (job.elapsed - model["startup"])
+                else:
+                    observed = job.input_bytes / max(job.elapsed - model["startup"], job.elapsed / 2, 0.1)
+                    model["bytes_per_second"] += SMOOTHING * (observed - model["bytes_per_second"])
+                self.tools[job.tool] = model
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(self.tools, f, indent=1)
+            os.replace(self.path + ".tmp", self.path)
+
+
+def preflight(jobs, history, max_workers=8):
+    """Parcourt en parallèle les entrées des tâches et estime leur durée.
+
+    Renseigne input_files, input_bytes et estimate sur chaque tâche et retourne les tâches.
+    """
+    paths = sorted({path for job in jobs for path in job.inputs})
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Les parcours de premier niveau ont leur propre pool: leurs sous-dossiers ne
+        # doivent pas attendre une place occupée par un parcours parent
+        with ThreadPoolExecutor(max_workers=max_workers) as subpool:
+            scanned = dict(zip(paths, pool.map(lambda path: scan_path(path, subpool), paths)))
+
+    for job in jobs:
+        job.input_files = sum(scanned[path][0] for path in job.inputs)
+        job.input_bytes = sum(scanned[path][1] for path in job.inputs)
+        job.estimate = history.estimate(job.tool, job.input_bytes) if job.tool else None
+    return jobs
+
+
+def remaining_time(jobs, max_workers):
+    """Temps restant estimé (s) pour un ensemble de tâches, ou None sans estimation.
+
+    Simule l'ordonnancement: les tâches en cours libèrent leur place après leur durée
+    estimée restante, puis les tâches en attente, les plus longues d'abord, prennent la
+    première place libre.
+    """
+    if not any(job.estimate is not None for job in jobs):
+        return None
+    slots = []
+    pending = []
+    for job in jobs:
+        estimate = job.estimate or 0.0
+        if job.status == "En cours":
+            slots.append(max(estimate - job.elapsed, 0.0))
+        elif job.status in ("En attente", "Copie"):
+            pending.append(estimate)
+    slots.extend([0.0] * max(0, (max_workers or 1) - len(slots)))
+    for estimate in sorted(pending, reverse=True):
+        slots.sort()
+        slots[0] += estimate
+    return max(slots, default=0.0)
+
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds} s"
+    if seconds < 3600:
+        return f"{seconds // 60} min {seconds % 60:02d} s"
+    return f"{seconds // 3600} h {seconds % 3600 // 60:02d} min"
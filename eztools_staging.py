@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import heapq
+import itertools
+import os
+import shutil
+import time
+
+from eztools_cache import is_live_system_path
+
+
+# Dossier local par défaut des copies d'artefacts
+DEFAULT_STAGING_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "staging")
+# Taille des blocs des copies séquentielles
+BLOCK_SIZE = 8 * 1024**2
+
+
+class CopyCancelled(Exception):
+    """Copie interrompue par l'annulation de l'analyse"""
+
+
+def staged_path(staging_dir, path):
+    """Emplacement local d'un artefact: chemin complet sans ':' sous le dossier de copie"""
+    drive, rest = os.path.splitdrive(os.path.abspath(path))
+    parts = [drive.replace(":", "").strip("\\/").replace("\\", "_")] + [p for p in rest.replace("\\", "/").split("/") if p]
+    return os.path.join(staging_dir, *[p for p in parts if p])
+
+
+def _is_current(source_stat, destination):
+    try:
+        st = os.stat(destination)
+    except OSError:
+        return False
+    return st.st_size == source_stat.st_size and st.st_mtime_ns == source_stat.st_mtime_ns
+
+
+def copy_file(source, destination, block_size=BLOCK_SIZE, cancelled=None, reuse=True, digests=None):
+    """Copie séquentielle par grands blocs, via un fichier temporaire; la date de modification
+    de la source est reportée sur la copie. Retourne le nombre d'octets copiés (0 si réutilisée).
+
+    L'événement cancelled est vérifié entre les blocs: la copie partielle est alors supprimée
+    et CopyCancelled levée. Sans reuse, une copie à jour en apparence est refaite. Avec
+    digests, le SHA-256 des octets lus dans la source y est noté pour la copie (chemin absolu).
+    """
+    st = os.stat(source)
+    if reuse and _is_current(st, destination):
+        return 0
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    partial = destination + ".part"
+    buffer = bytearray(block_size)
+    view = memoryview(buffer)
+    copied = 0
+    digest = hashlib.sha256() if digests is not None else None
+    with open(source, "rb", buffering=0) as src, open(partial, "wb", buffering=0) as dst:
+        while size := src.readinto(buffer):
+            if cancelled is not None and cancelled.is_set():
+                break
+            dst.write(view[:size])
+            if digest is not None:
+                digest.update(view[:size])
+            copied += size
+    if cancelled is not None and cancelled.is_set():
+        os.remove(partial)
+        raise CopyCancelled(source)
+    os.utime(partial, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(partial, destination)
+    if digests is not None:
+        digests[os.path.abspath(destination)] = digest.hexdigest()
+    return copied
+
+
+def _remove_extra(source, destination):
+    """Supprime de la copie destination les fichiers et dossiers absents de source.
+
+    Retourne le nombre de fichiers supprimés.
+    """
+    removed = 0
+    for directory, dirs, names in os.walk(destination, topdown=False):
+        origin = os.path.join(source, os.path.relpath(directory, destination))
+        for name in names:
+            if not os.path.isfile(os.path.join(origin, name)):
+                os.remove(os.path.join(directory, name))
+                removed += 1
+        for name in dirs:
+            if not os.path.isdir(os.path.join(origin, name)):
+                shutil.rmtree(os.path.join(directory, name))
+    return removed
+
+
+def copy_tree(source, destination, block_size=BLOCK_SIZE, cancelled=None, reuse=True, digests=None):
+    """Copie un fichier ou un dossier.
+
+    Une copie de dossier existante est d'abord synchronisée avec la source: les fichiers
+    supprimés de la source (ou d'une autre image montée au même endroit) n'y restent pas.
+    Retourne (fichiers, octets copiés, fichiers réutilisés, fichiers supprimés de la copie).
+    """
+    if not os.path.isdir(source):
+        if os.path.isdir(destination):
+            shutil.rmtree(destination)
+        copied = copy_file(source, destination, block_size, cancelled, reuse, digests)
+        return 1, copied, int(copied == 0 and os.path.getsize(source) > 0), 0
+    if os.path.isfile(destination):
+        os.remove(destination)
+    files = copied = reused = 0
+    removed = _remove_extra(source, destination) if os.path.isdir(destination) else 0
+    os.makedirs(destination, exist_ok=True)
+    for directory, dirs, names in os.walk(source):
+        dirs.sort()
+        target = os.path.join(destination, os.path.relpath(directory, source))
+        os.makedirs(target, exist_ok=True)
+        for name in sorted(names):
+            size = copy_file(os.path.join(directory, name), os.path.join(target, name), block_size, cancelled, reuse, digests)
+            files += 1
+            copied += size
+            reused += size == 0
+    return files, copied, reused, removed
+
+
+class Stager:
+    """Copie les entrées des outils dans un dossier local avant leur analyse.
+
+    Les copies passent une à une (lectures séquentielles, sans se disputer le disque ou
+    le réseau source), les plus petites d'abord: un outil dont l'entrée est copiée démarre
+    pendant que les copies plus longues continuent. Les copies à jour (même taille, même
+    date de modification que la source) sont réutilisées d'une analyse à l'autre, sauf
+    depuis le volume système en cours d'utilisation. L'annulation interrompt la copie en cours.
+
+    digests garde le SHA-256 des octets de l'original lus pour chaque copie faite pendant la
+    session: le paquet de preuves vérifie les copies avec, sans relire les originaux.
+    """
+
+    def __init__(self, staging_dir=None, block_size=BLOCK_SIZE):
+        self.staging_dir = os.path.abspath(staging_dir or DEFAULT_STAGING_DIR)
+        self.block_size = block_size
+        self._waiters = []
+        self._counter = itertools.count()
+        self._busy = False
+        self.digests = {}
+
+    async def _acquire(self, priority):
+        # Toutes les demandes arrivées dans le même tour de boucle sont départagées par priorité
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        asyncio.get_running_loop().call_soon(self._dispatch)
+        await future
+
+    def _dispatch(self):
+        while not self._busy and self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self._busy = True
+                future.set_result(None)
+
+    def _release(self):
+        self._busy = False
+        self._dispatch()
+
+    async def stage(self, path, runner, priority=0):
+        """Copie path dans le dossier local et retourne la copie; retourne path si la copie échoue"""
+        destination = staged_path(self.staging_dir, path)
+        await self._acquire(priority)
+        try:
+            if runner.cancelled.is_set():
+                return path
+            started = time.monotonic()
+            files, copied, reused, removed = await asyncio.to_thread(
+                copy_tree, path, destination, self.block_size, runner.cancelled, not is_live_system_path(path), self.digests
+            )
+        except CopyCancelled:
+            runner.write(f"Copie locale de {path} annulée\n")
+            return path
+        except OSError as e:
+            runner.write(f"Copie locale impossible de {path} ({str(e)}), analyse de l'original\n")
+            return path
+        finally:
+            self._release()
+
+        elapsed = time.monotonic() - started
+        if removed:
+            runner.write(f"Copie locale de {path}: {removed} fichier(s) absent(s) de la source supprimé(s)\n")
+        if copied:
+            runner.write(f"Copie locale de {path}: {files} fichier(s), {copied / 1024**2:.1f} Mo en {elapsed:.1f} s"
+                         f" ({copied / 1024**2 / max(elapsed, 0.001):.0f} Mo/s)\n")
+        else:
+            runner.write(f"Copie locale de {path} réutilisée ({files} fichier(s))\n")
+        return destination
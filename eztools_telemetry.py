@@ -0,0 +1,224 @@
+import asyncio
+import json
+import os
+import platform
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+import psutil
+
+
+# Intervalle d'échantillonnage de l'arbre de processus d'un outil (s)
+SAMPLE_INTERVAL = 0.5
+
+
+@dataclass
+class ResourceUsage:
+    """Ressources consommées par les processus d'une tâche (arbre de processus compris)"""
+    cpu_seconds: float = 0.0
+    rss: int = 0
+    peak_rss: int = 0
+    read_bytes: int = 0
+    write_bytes: int = 0
+
+
+def _open_process(pid):
+    """Handle Windows d'un processus, gardé ouvert pour lire ses compteurs après sa fin, ou None"""
+    if os.name != "nt":
+        return None
+    import ctypes
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    return ctypes.windll.kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid) or None
+
+
+def _exited_counters(handle):
+    """(cpu, lecture, écriture) d'un processus terminé, lus sur son handle Windows"""
+    import ctypes
+    from ctypes import wintypes
+
+    class IoCounters(ctypes.Structure):
+        _fields_ = [(name, ctypes.c_ulonglong) for name in (
+            "ReadOperationCount", "WriteOperationCount", "OtherOperationCount",
+            "ReadTransferCount", "WriteTransferCount", "OtherTransferCount"
+        )]
+
+    kernel32 = ctypes.windll.kernel32
+    creation, exit_time, kernel, user = (wintypes.FILETIME() for _ in range(4))
+    if not kernel32.GetProcessTimes(handle, *(ctypes.byref(t) for t in (creation, exit_time, kernel, user))):
+        return None
+    io = IoCounters()
+    if not kernel32.GetProcessIoCounters(handle, ctypes.byref(io)):
+        io = IoCounters()
+    # FILETIME: intervalles de 100 ns
+    cpu = sum((t.dwHighDateTime << 32 | t.dwLowDateTime) for t in (kernel, user)) / 1e7
+    return cpu, io.ReadTransferCount, io.WriteTransferCount
+
+
+class ProcessTreeSampler:
+    """Échantillonne un processus et ses descendants et cumule leur consommation dans usage.
+
+    Plusieurs échantillonneurs peuvent alimenter le même ResourceUsage (passes parallèles
+    d'une même tâche): chacun n'y ajoute que ses écarts depuis l'échantillon précédent.
+    Appeler sample() quand les sorties de l'outil se ferment, avant d'attendre sa fin, puis
+    stop() une fois le processus terminé: sous Windows, stop() relit les totaux exacts du
+    processus sur un handle gardé ouvert. Ailleurs, un processus déjà attendu lors du dernier
+    échantillon perd au plus SAMPLE_INTERVAL de mesure.
+    """
+
+    def __init__(self, pid, usage):
+        self.pid = pid
+        self.usage = usage
+        self.counters = {}  # pid -> (cpu, lecture, écriture) au dernier échantillon
+        self.children_cpu = {}  # pid -> temps CPU des descendants déjà attendus par ce processus
+        self.vanished_cpu = 0.0  # temps CPU déjà compté des descendants disparus
+        self.rss = 0
+        self.handle = _open_process(pid)
+
+    def _tree(self):
+        try:
+            parent = psutil.Process(self.pid)
+            return [parent] + parent.children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return []
+
+    def _add(self, pid, current):
+        previous = self.counters.get(pid, (0.0, 0, 0))
+        self.usage.cpu_seconds += max(0.0, current[0] - previous[0])
+        self.usage.read_bytes += max(0, current[1] - previous[1])
+        self.usage.write_bytes += max(0, current[2] - previous[2])
+        self.counters[pid] = current
+
+    def sample(self):
+        rss = 0
+        seen = set()
+        reaped_cpu = 0.0
+        for proc in self._tree():
+            try:
+                with proc.oneshot():
+                    times = proc.cpu_times()
+                    rss += proc.memory_info().rss
+                    try:
+                        io = proc.io_counters()
+                        read_bytes, write_bytes = io.read_bytes, io.write_bytes
+                    except (AttributeError, psutil.AccessDenied):  # io_counters absent sous macOS
+                        read_bytes = write_bytes = 0
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            seen.add(proc.pid)
+            self._add(proc.pid, (times.user + times.system, read_bytes, write_bytes))
+            # Un descendant terminé entre deux échantillons apparaît dans les temps "children"
+            # de son parent (POSIX, s'il l'a attendu): sa part non encore comptée y est reprise
+            children = getattr(times, "children_user", 0.0) + getattr(times, "children_system", 0.0)
+            reaped_cpu += max(0.0, children - self.children_cpu.get(proc.pid, 0.0))
+            self.children_cpu[proc.pid] = children
+
+        for pid in [pid for pid in self.counters if pid not in seen and pid != self.pid]:
+            self.vanished_cpu += self.counters.pop(pid)[0]
+            self.children_cpu.pop(pid, None)
+        uncounted = max(0.0, reaped_cpu - self.vanished_cpu)
+        self.vanished_cpu = max(0.0, self.vanished_cpu - reaped_cpu)
+        self.usage.cpu_seconds += uncounted
+
+        self.usage.rss += rss - self.rss
+        self.rss = rss
+        self.usage.peak_rss = max(self.usage.peak_rss, self.usage.rss)
+
+    async def run(self, interval=SAMPLE_INTERVAL):
+        """Échantillonne jusqu'à annulation de la tâche asyncio"""
+        while True:
+            self.sample()
+            await asyncio.sleep(interval)
+
+    def stop(self):
+        """Dernier échantillon, totaux exacts du processus terminé si disponibles, puis retrait
+        de sa mémoire courante"""
+        self.sample()
+        if self.handle is not None:
+            import ctypes
+
+            try:
+                counters = _exited_counters(self.handle)
+                if counters is not None:
+                    self._add(self.pid, counters)
+            finally:
+                ctypes.windll.kernel32.CloseHandle(self.handle)
+                self.handle = None
+        self.usage.rss -= self.rss
+        self.rss = 0
+
+
+def count_rows(path):
+    """Nombre de lignes de données d'un CSV (en-tête exclu)"""
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(0, lines - 1)
+
+
+def measure_outputs(paths):
+    """(lignes, octets) des fichiers produits par une tâche"""
+    rows = 0
+    size = 0
+    for path in paths:
+        try:
+            size += os.path.getsize(path)
+            rows += count_rows(path)
+        except OSError:
+            continue
+    return rows, size
+
+
+def format_bytes(value):
+    for unit in ("o", "Ko", "Mo", "Go"):
+        if value < 1024 or unit == "Go":
+            return f"{value:.0f} {unit}" if unit == "o" else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+def job_report(job):
+    """Mesures d'une tâche sous forme de dict sérialisable"""
+    usage = asdict(job.usage)
+    usage.pop("rss")
+    usage["cpu_seconds"] = round(usage["cpu_seconds"], 3)
+    return dict(
+        name=job.name,
+        status=job.status,
+        returncode=job.returncode,
+        started_at=job.started_at,
+        wall_seconds=round(job.elapsed, 3),
+        cpu_percent=round(job.usage.cpu_seconds / job.elapsed * 100, 1) if job.elapsed else 0.0,
+        outputs=job.outputs,
+        output_rows=job.output_rows,
+        output_bytes=job.output_bytes,
+        **usage
+    )
+
+
+def host_info():
+    memory = psutil.virtual_memory()
+    return {
+        "hostname": platform.node(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "memory_bytes": memory.total
+    }
+
+
+def write_run_report(path, jobs, **extra):
+    """Écrit le rapport JSON d'une exécution (machine, tâches et leurs mesures) et retourne son chemin"""
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "host": host_info(),
+        **extra,
+        "jobs": [job_report(job) for job in jobs]
+    }
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    os.replace(path + ".tmp", path)
+    return path
@@ -0,0 +1,189 @@
+import csv
+import heapq
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+from eztools_columnar import open_records
+
+
+# Colonnes de la super-timeline
+TIMELINE_COLUMNS = ["Timestamp", "TimestampType", "Tool", "Description", "Details", "SourceFile"]
+
+# Nombre d'événements triés en mémoire avant d'être écrits dans un fichier temporaire
+DEFAULT_CHUNK_ROWS = 200_000
+# Nombre maximal de fichiers temporaires fusionnés à la fois
+DEFAULT_FAN_IN = 64
+
+# Les CSV de MFTECmd peuvent contenir des champs très longs
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+
+TIMESTAMP_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})[ T](\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,7}))?")
+US_TIMESTAMP_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4}) (\d{1,2}):(\d{2}):(\d{2})(?:\.(\d{1,7}))?")
+
+
+def _join(*parts):
+    return "\\".join(part.rstrip("\\") for part in parts if part)
+
+
+def _details(row, columns):
+    return " | ".join(f"{column}: {row[column]}" for column in columns if row.get(column))
+
+
+# Profils des CSV des outils: colonnes de signature, colonnes horodatées et description d'une ligne
+PROFILES = {
+    "MFTECmd": {
+        "signature": {"EntryNumber", "ParentPath", "FileName"},
+        "timestamps": [
+            "Created0x10", "Created0x30", "LastModified0x10", "LastModified0x30",
+            "LastRecordChange0x10", "LastRecordChange0x30", "LastAccess0x10", "LastAccess0x30"
+        ],
+        "description": lambda row: _join(row.get("ParentPath"), row.get("FileName")),
+        "details": lambda row: _details(row, ["EntryNumber", "FileSize", "InUse"])
+    },
+    "PECmd": {
+        "signature": {"ExecutableName", "LastRun"},
+        "timestamps": ["LastRun"] + [f"PreviousRun{i}" for i in range(7)] + ["SourceCreated", "SourceModified"],
+        "description": lambda row: row.get("ExecutableName", ""),
+        "details": lambda row: _details(row, ["RunCount", "SourceFilename"])
+    },
+    "PECmd Timeline": {
+        "signature": {"ExecutableName", "RunTime"},
+        "timestamps": ["RunTime"],
+        "description": lambda row: row.get("ExecutableName", ""),
+        "details": lambda row: ""
+    },
+    "JLECmd": {
+        "signature": {"SourceFile", "AppId"},
+        "timestamps": [
+            "SourceCreated", "SourceModified", "SourceAccessed", "CreationTime", "LastModified",
+            "TargetCreated", "TargetModified", "TargetAccessed"
+        ],
+        "description": lambda row: row.get("LocalPath") or row.get("TargetIDAbsolutePath") or row.get("Path", ""),
+        "details": lambda row: _details(row, ["AppIdDescription", "SourceFile"])
+    },
+    "RECmd": {
+        "signature": {"HivePath", "KeyPath", "LastWriteTimestamp"},
+        "timestamps": ["LastWriteTimestamp"],
+        "description": lambda row: _join(row.get("KeyPath"), row.get("ValueName")) + (f" = {row['ValueData']}" if row.get("ValueData") else ""),
+        "details": lambda row: _details(row, ["Category", "Description", "HivePath"])
+    }
+}
+
+GENERIC_TIMESTAMP_RE = re.compile(r"time|date|created|modified|accessed|lastrun", re.IGNORECASE)
+
+
+def detect_profile(columns):
+    """Retourne (nom, profil) d'après l'en-tête d'un CSV; profil générique si l'outil est inconnu"""
+    header = set(columns)
+    for name, profile in PROFILES.items():
+        if profile["signature"] <= header:
+            return name, profile
+    return "CSV", {
+        "timestamps": [column for column in columns if GENERIC_TIMESTAMP_RE.search(column)],
+        "description": lambda row: "",
+        "details": lambda row: ""
+    }
+
+
+def normalize_timestamp(value):
+    """Convertit un horodatage EZ tools en 'AAAA-MM-JJ HH:MM:SS.fffffff' (triable), ou None"""
+    if not value:
+        return None
+    # Cas courant: déjà au format des outils EZ (yyyy-MM-dd HH:mm:ss.fffffff)
+    if len(value) == 27 and value[10] == " " and TIMESTAMP_RE.match(value):
+        return value
+    match = TIMESTAMP_RE.match(value)
+    if match:
+        year, month, day, hour, minute, second, fraction = match.groups()
+    else:
+        match = US_TIMESTAMP_RE.match(value)
+        if not match:
+            return None
+        month, day, year, hour, minute, second, fraction = match.groups()
+    return (f"{year}-{int(month):02d}-{int(day):02d} {int(hour):02d}:{minute}:{second}"
+            f".{(fraction or '').ljust(7, '0')}")
+
+
+def iter_events(csv_file):
+    """Produit les événements normalisés (une ligne par horodatage renseigné) d'un CSV d'outil.
+
+    Le fichier Parquet associé au CSV est lu à sa place s'il existe (voir eztools_columnar).
+    """
+    source = os.path.basename(csv_file)
+    with open_records(csv_file) as (fieldnames, records):
+        tool, profile = detect_profile(fieldnames)
+        columns = [column for column in profile["timestamps"] if column in fieldnames]
+        for row in records:
+            description = None
+            for column in columns:
+                timestamp = normalize_timestamp(row.get(column))
+                if timestamp is None:
+                    continue
+                if description is None:
+                    description = profile["description"](row)
+                    details = profile["details"](row)
+                yield [timestamp, column, tool, description, details, source]
+
+
+def _write_run(events, temp_dir):
+    events.sort(key=lambda event: event[0])
+    fd, path = tempfile.mkstemp(suffix=".csv", prefix="timeline_run_", dir=temp_dir)
+    with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(events)
+    return path
+
+
+def _merge_runs(run_paths, output, header=None):
+    """Fusionne des fichiers déjà triés vers output (un chemin) en flux"""
+    files = [open(path, newline="", encoding="utf-8") for path in run_paths]
+    try:
+        with open(output, "w", newline="", encoding="utf-8") as out:
+            writer = csv.writer(out)
+            if header:
+                writer.writerow(header)
+            writer.writerows(heapq.merge(*(csv.reader(f) for f in files), key=lambda event: event[0]))
+    finally:
+        for f in files:
+            f.close()
+
+
+def merge_timelines(csv_files, output_file, chunk_rows=DEFAULT_CHUNK_ROWS, fan_in=DEFAULT_FAN_IN, temp_dir=None):
+    """Fusionne les CSV des outils en une super-timeline triée par horodatage.
+
+    Tri externe: les événements sont triés par blocs de chunk_rows écrits sur disque,
+    puis fusionnés par au plus fan_in fichiers à la fois; la mémoire utilisée ne dépend
+    pas de la taille des CSV. Retourne le nombre d'événements écrits.
+    """
+    temp_dir = tempfile.mkdtemp(prefix="supertimeline_", dir=temp_dir or os.path.dirname(os.path.abspath(output_file)))
+    runs = []
+    count = 0
+    try:
+        events = []
+        for csv_file in csv_files:
+            for event in iter_events(csv_file):
+                events.append(event)
+                if len(events) >= chunk_rows:
+                    runs.append(_write_run(events, temp_dir))
+                    count += len(events)
+                    events = []
+        if events or not runs:
+            runs.append(_write_run(events, temp_dir))
+            count += len(events)
+
+        # Fusions intermédiaires tant qu'il y a trop de fichiers à ouvrir en même temps
+        while len(runs) > fan_in:
+            batch, runs = runs[:fan_in], runs[fan_in:]
+            fd, merged = tempfile.mkstemp(suffix=".csv", prefix="timeline_run_", dir=temp_dir)
+            os.close(fd)
+            _merge_runs(batch, merged)
+            for path in batch:
+                os.remove(path)
+            runs.append(merged)
+
+        _merge_runs(runs, output_file, header=TIMELINE_COLUMNS)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return count
@@ -0,0 +1,81 @@
+import os
+import subprocess
+
+import psutil
+
+
+# Nombre maximal de TimelineExplorer ouverts en même temps
+MAX_VIEWERS = 4
+
+
+def _normalize(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+class ViewerLauncher:
+    """Regroupe les ouvertures de CSV dans TimelineExplorer.
+
+    Les fichiers demandés s'accumulent (request) et sont ouverts ensemble (flush), un fichier
+    par processus: TimelineExplorer n'ouvre de façon sûre que le premier fichier de sa ligne de commande.
+    Un fichier déjà ouvert dans un TimelineExplorer en cours, lancé par cette application ou
+    non, n'est pas rouvert; au-delà de max_viewers processus ouverts, les fichiers restent en
+    attente jusqu'à la fermeture d'une fenêtre.
+    """
+
+    def __init__(self, executable, max_viewers=MAX_VIEWERS):
+        self.executable = executable
+        self.max_viewers = max_viewers
+        self.pending = []
+        self.processes = []
+
+    def running_viewers(self):
+        """Processus TimelineExplorer en cours: [(pid, fichier ouvert d'après leur ligne de commande)]"""
+        # Les fenêtres lancées ici et déjà fermées sont libérées (pas de processus zombie)
+        self.processes = [process for process in self.processes if process.poll() is None]
+        name = os.path.basename(self.executable).lower()
+        viewers = []
+        for proc in psutil.process_iter(["name", "cmdline"]):
+            try:
+                if (proc.info["name"] or "").lower() != name:
+                    continue
+                # Seul le premier argument est sûrement ouvert
+                files = {_normalize(arg) for arg in (proc.info["cmdline"] or [])[1:2]}
+            except (psutil.Error, OSError):
+                continue
+            viewers.append((proc.pid, files))
+        return viewers
+
+    def request(self, path):
+        """Demande l'ouverture d'un fichier au prochain flush"""
+        if _normalize(path) not in {_normalize(p) for p in self.pending}:
+            self.pending.append(path)
+
+    def flush(self, viewers=None):
+        """Lance les visualiseurs pour les fichiers en attente.
+
+        viewers: résultat de running_viewers, si le parcours des processus a déjà été fait
+        (l'interface le fait dans un thread de fond).
+        Retourne (fichiers ouverts, fichiers déjà ouverts ignorés, fichiers toujours en attente).
+        Lève OSError si TimelineExplorer ne peut pas être lancé.
+        """
+        if not self.pending:
+            return [], [], []
+        if viewers is None:
+            viewers = self.running_viewers()
+        already_open = set().union(*(files for _, files in viewers))
+        skipped = [path for path in self.pending if _normalize(path) in already_open]
+        todo = [path for path in self.pending if _normalize(path) not in already_open]
+
+        launched = []
+        slots = self.max_viewers - len(viewers)
+        try:
+            while todo and slots > 0:
+                self.processes.append(subprocess.Popen([self.executable, os.path.abspath(todo[0])]))
+                launched.append(todo.pop(0))
+                slots -= 1
+        except OSError:
+            # Lancement impossible: les fichiers restants ne sont pas redemandés
+            self.pending = []
+            raise
+        self.pending = todo
+        return launched, skipped, todo
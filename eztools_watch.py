@@ -0,0 +1,222 @@
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from eztools_core import Engine, ToolRunner, evidence_path, find_users, merge_csv_files, recent_path
+
+
+INDEX_NAME = "watch_index.json"
+# Nombre maximal de fichiers analysés par relève, et taille d'un CSV cumulé avant rotation
+BATCH_FILES = 200
+ROLLING_MAX_BYTES = 512 * 1024**2
+# Un fichier modifié il y a moins de SETTLE_SECONDS est peut-être en cours d'écriture
+SETTLE_SECONDS = 2.0
+
+
+def watch_targets(root, users=None):
+    """Dossiers surveillés: (outil, dossier absolu, extension des fichiers à analyser)"""
+    targets = [("PECmd", evidence_path(root, "Windows", "Prefetch"), ".pf")]
+    for user in users if users is not None else (find_users(root) or []):
+        targets.append(("JLECmd", os.path.join(recent_path(root, user), "AutomaticDestinations"), ".automaticdestinations-ms"))
+    # Chemins absolus: l'index reste valable quel que soit le dossier courant
+    return [(tool, os.path.abspath(directory), extension) for tool, directory, extension in targets]
+
+
+class WatchIndex:
+    """Fichiers déjà analysés (chemin -> taille, date de modification), enregistrés en JSON"""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.files = json.load(f)
+        except (OSError, ValueError):
+            self.files = {}
+
+    def is_current(self, path, st):
+        entry = self.files.get(path)
+        return entry is not None and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+
+    def mark(self, path, st, ok):
+        # Un fichier en échec est aussi noté: il n'est réessayé que s'il change
+        self.files[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "ok": ok}
+
+    def save(self):
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.files, f, indent=1)
+        os.replace(self.path + ".tmp", self.path)
+
+
+def scan_changes(directory, extension, index, now=None):
+    """Fichiers nouveaux ou modifiés d'un dossier: [(chemin, stat)], du plus ancien au plus récent.
+
+    Une seule lecture du dossier par relève: os.scandir fournit tailles et dates sans
+    ouvrir les fichiers (sous Windows, sans appel système supplémentaire par fichier).
+    """
+    now = now or time.time()
+    changes = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if not entry.name.lower().endswith(extension):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if now - st.st_mtime < SETTLE_SECONDS or index.is_current(entry.path, st):
+                    continue
+                changes.append((entry.path, st))
+    except OSError:
+        return []
+    return sorted(changes, key=lambda change: change[1].st_mtime_ns)
+
+
+class RollingCsv:
+    """CSV cumulé d'un outil: les nouvelles lignes sont ajoutées à la fin; au-delà de max_bytes
+    (ou si l'en-tête change), le fichier est archivé sous un nom horodaté et un nouveau commence"""
+
+    def __init__(self, path, max_bytes=ROLLING_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def _header(self, path):
+        with open(path, "rb") as f:
+            return f.readline().lstrip(b"\xef\xbb\xbf")
+
+    def _rotate(self):
+        stem, ext = os.path.splitext(self.path)
+        os.replace(self.path, f"{stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{ext}")
+
+    def append(self, csv_files):
+        """Ajoute les lignes de csv_files (même en-tête) et retourne le nombre de fichiers ajoutés"""
+        if not csv_files:
+            return 0
+        if os.path.exists(self.path) and (
+            os.path.getsize(self.path) >= self.max_bytes or self._header(self.path) != self._header(csv_files[0])
+        ):
+            self._rotate()
+
+        merged = self.path + ".batch"
+        merge_csv_files(csv_files, merged)
+        try:
+            exists = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+            with open(merged, "rb") as src, open(self.path, "ab") as out:
+                if exists:
+                    src.readline()
+                shutil.copyfileobj(src, out, 1024 * 1024)
+        finally:
+            os.remove(merged)
+        return len(csv_files)
+
+
+async def _parse_file(engine, runner, tool, path, work_dir, number, semaphore):
+    async with semaphore:
+        output_dir = os.path.join(work_dir, f"{number:05d}")
+        command = engine.build_file_command(tool, path, output_dir, "out.csv")
+        returncode = await runner.run_command(command, prefix=f"[{tool} {os.path.basename(path)}] ")
+        csv_files = []
+        if returncode == 0 and os.path.isdir(output_dir):
+            csv_files = sorted(entry.path for entry in os.scandir(output_dir) if entry.name.endswith(".csv"))
+        return returncode, csv_files
+
+
+async def process_changes(engine, runner, tool, changes, output_dir, index, max_workers=None):
+    """Analyse fichier par fichier (-f, en parallèle) et ajoute les lignes aux CSV cumulés de l'outil.
+
+    Retourne (fichiers analysés, fichiers en échec).
+    """
+    work_dir = tempfile.mkdtemp(prefix=f"{tool}_watch_", dir=output_dir)
+    semaphore = asyncio.Semaphore(max_workers or os.cpu_count() or 1)
+    try:
+        results = await asyncio.gather(*(
+            _parse_file(engine, runner, tool, path, work_dir, number, semaphore)
+            for number, (path, _) in enumerate(changes)
+        ))
+
+        # Un outil peut produire plusieurs CSV par fichier (PECmd: out.csv et out_Timeline.csv):
+        # chaque sorte a son propre CSV cumulé
+        by_kind = {}
+        failed = 0
+        for (path, st), (returncode, csv_files) in zip(changes, results):
+            if returncode is None:
+                continue
+            index.mark(path, st, returncode == 0)
+            if returncode != 0:
+                failed += 1
+                runner.write(f"[{tool}] Erreur sur {path} (code {returncode})\n")
+            for csv_file in csv_files:
+                kind = os.path.basename(csv_file)[len("out"):-len(".csv")]
+                by_kind.setdefault(kind, []).append(csv_file)
+
+        for kind, csv_files in by_kind.items():
+            await asyncio.to_thread(RollingCsv(os.path.join(output_dir, f"{tool}_watch{kind}.csv")).append, csv_files)
+        await asyncio.to_thread(index.save)
+        return len(changes) - failed, failed
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+async def poll(engine, runner, targets, output_dir, index, max_workers=None):
+    """Une relève: détecte et analyse les fichiers nouveaux ou modifiés de chaque dossier surveillé"""
+    total = 0
+    for tool, directory, extension in targets:
+        changes = scan_changes(directory, extension, index)
+        for start in range(0, len(changes), BATCH_FILES):
+            if runner.cancelled.is_set():
+                return total
+            batch = changes[start:start + BATCH_FILES]
+            runner.write(f"[{tool}] {len(batch)} fichier(s) nouveau(x) ou modifié(s) dans {directory}\n")
+            parsed, failed = await process_changes(engine, runner, tool, batch, output_dir, index, max_workers)
+            total += parsed
+    return total
+
+
+def watch(root, output_dir, tools_dir=None, users=None, interval=30.0, once=False, max_workers=None, runner=None):
+    """Surveille Prefetch et les Jump Lists d'une racine et n'analyse que les fichiers nouveaux ou modifiés.
+
+    Les lignes produites sont ajoutées aux CSV cumulés <outil>_watch*.csv du dossier de sortie;
+    watch_index.json y garde les fichiers déjà analysés, d'une session à l'autre.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    engine = Engine(tools_dir)
+    runner = runner or ToolRunner()
+    index = WatchIndex(os.path.join(output_dir, INDEX_NAME))
+    targets = watch_targets(root, users)
+
+    while not runner.cancelled.is_set():
+        started = time.monotonic()
+        parsed = asyncio.run(poll(engine, runner, targets, output_dir, index, max_workers))
+        if parsed:
+            runner.write(f"{parsed} fichier(s) analysé(s) en {time.monotonic() - started:.1f} s\n")
+        if once:
+            break
+        runner.cancelled.wait(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Surveille Prefetch et les Jump Lists et analyse les nouveaux fichiers au fil de l'eau")
+    parser.add_argument("root", help="Racine à surveiller (lettre de lecteur ou point de montage)")
+    parser.add_argument("output_dir", help="Dossier des CSV cumulés et de l'index des fichiers analysés")
+    parser.add_argument("--tools-dir", help="Dossier des outils (net6 par défaut)")
+    parser.add_argument("--user", action="append", help="Profil dont surveiller les Jump Lists (tous par défaut)")
+    parser.add_argument("--interval", type=float, default=30.0, help="Intervalle entre deux relèves, en secondes")
+    parser.add_argument("--max-workers", type=int, help="Nombre maximal d'analyses simultanées")
+    parser.add_argument("--once", action="store_true", help="Une seule relève puis arrêt")
+    args = parser.parse_args(argv)
+
+    try:
+        watch(args.root, args.output_dir, args.tools_dir, args.user, args.interval, args.once, args.max_workers)
+    except KeyboardInterrupt:
+        print("\nSurveillance arrêtée", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
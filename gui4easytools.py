@@ -1,22 +1,63 @@
+import asyncio
 import base64
 import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext
 import subprocess
 import locale
 import os
-from pathlib import Path
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import psutil
 import ctypes
 
+from eztools_cache import ResultCache
+from eztools_columnar import columnar_available, convert_csv
+from eztools_governor import Governor, GovernorSettings, PROFILES as GOVERNOR_PROFILES
+from eztools_index import index_csv, index_path, search
+from eztools_package import package_run
+from eztools_staging import Stager
+from eztools_preflight import ThroughputHistory, format_duration, preflight, remaining_time
+from eztools_telemetry import format_bytes, write_run_report
+from eztools_timeline import merge_timelines
+from eztools_viewer import ViewerLauncher
+from eztools_core import (
+    Engine, EngineError, ToolRunner, JobScheduler, DiscoveryCache,
+    find_users, evidence_path, list_drives, partition_report, physical_disk_report
+)
+
 
 class EZToolsGUI:
-    def __init__(self, root):
+    # Intervalle de relève de la sortie des outils (ms) et nombre max de messages par relève
+    POLL_INTERVAL_MS = 100
+    POLL_BATCH_SIZE = 2000
+    # Durée de validité (s) des informations sur les lecteurs, partitions et utilisateurs
+    DISCOVERY_TTL = 300
+    # Libellés des priorités du gouverneur de ressources
+    PRIORITY_LABELS = {"normal": "Normale", "low": "Basse", "idle": "Minimale"}
+    # Délai (ms) de regroupement des ouvertures dans TimelineExplorer, et de nouvel essai
+    # quand le nombre maximal de fenêtres est atteint
+    VIEWER_DEBOUNCE_MS = 1000
+    VIEWER_RETRY_MS = 5000
+
+    def __init__(self, root, data_dir=None):
         self.root = root
+        # Dossier du cache, de l'historique des débits et des journaux (dossier du projet par défaut)
+        self.data_dir = data_dir or os.path.dirname(os.path.abspath(__file__))
         self.root.title("EZ Tools Forensics GUI")
         self.root.geometry("1000x800")
         #chemin pour timelineexplorer
         self.timeline_explorer_path = "../net6/TimelineExplorer/TimelineExplorer"
+        # Ouvertures dans TimelineExplorer regroupées par lots
+        self.viewer = ViewerLauncher(
+            os.path.abspath(os.path.join(os.path.dirname(__file__), self.timeline_explorer_path + ".exe"))
+        )
+        self._viewer_flush = None
+        self._viewer_waiting = False
+        self._viewer_scanning = False
         
         # Définir l'icône de la fenêtre
         icon = tk.PhotoImage(file="danger.png")  
@@ -27,40 +68,26 @@ class EZToolsGUI:
         self.input_path = tk.StringVar()
         self.output_path = tk.StringVar()
         self.output_name = tk.StringVar()
+
+        # Exécution des outils en arrière-plan
+        self.engine = Engine(cache=ResultCache(os.path.join(self.data_dir, "cache")))
+        self.tools = self.engine.tools
+        self.runner = QueueRunner()
+        self.stager = Stager()
+        # Tâches de toute la session, pour le rapport de session
+        self.session_jobs = []
+        # Débits mesurés des outils, pour estimer la durée des analyses
+        self.throughput = ThroughputHistory(os.path.join(self.data_dir, "cache", "throughput.json"))
         
         # Définir le lecteur par défaut
         self.drive = "C:"
-        
-        # Définir le chemin de base en fonction de l'emplacement du script
-        base_path = os.path.dirname(os.path.abspath(__file__))
-
-        self.tools = {
-            "MFTECmd": {
-                "description": "Analyse MFT",
-                "extensions": [("All files", "*.*")],
-                "command": os.path.abspath(os.path.join(base_path, "../net6/MFTECmd.exe")),  # Chemin absolu
-                "direct_drive": True,
-                "default_path": lambda drive: f"{drive}/$MFT"
-            },
-            "RECmd": {
-                "description": "Analyse Registre",
-                "extensions": [("All files", "*.*")],
-                "command": os.path.abspath(os.path.join(base_path, "../net6/RECmd/RECmd.exe")),  # Chemin absolu
-                "default_path": lambda drive: f"{drive}/Windows/System32/config"
-            },
-            "JLECmd": {
-                "description": "Analyse Jump Lists",
-                "extensions": [("All files", "*.*")],
-                "command": os.path.abspath(os.path.join(base_path, "../net6/JLECmd.exe")),  # Chemin absolu
-                "default_path": lambda drive, user: f"{drive}/Users/{user}/AppData/Roaming/Microsoft/Windows/Recent"
-            },
-            "PECmd": {
-                "description": "Analyse Prefetch",
-                "extensions": [("All files", "*.*")],
-                "command": os.path.abspath(os.path.join(base_path, "../net6/PECmd.exe")),  # Chemin absolu
-                "default_path": lambda drive: f"{drive}/Windows/Prefetch"
-            }
-        }
+
+        # Découverte des lecteurs et utilisateurs en arrière-plan, avec cache
+        self.discovery = DiscoveryCache(ttl=self.DISCOVERY_TTL)
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        # Recherche, découverte et pré-calcul des analyses ont leurs propres threads: ils ne doivent pas attendre la fin
+        # d'un post-traitement long (indexation, super-timeline, paquet de preuves)
+        self.interactive_executor = ThreadPoolExecutor(max_workers=2)
         
         # Configurer l'interface
         self.setup_gui()
@@ -69,16 +96,8 @@ class EZToolsGUI:
         if not is_admin():
             self.root.after(1000, lambda: self.show_admin_warning())
         
-        # Afficher les informations sur les partitions lors de l'ouverture
-        self.show_partition_info()
-
-        self.console.insert(tk.END, "\n")  # Ligne vide pour espacement
-        self.console.insert(tk.END, "\n")  # Ligne vide pour espacement
-        self.console.insert(tk.END, "\n")  # Ligne vide pour espacement
-        self.update_users_list()  # Afficher les utilisateurs trouvés une seule fois
-        self.console.insert(tk.END, "\n")  # Ligne vide pour espacement
-        self.console.insert(tk.END, "\n")  # Ligne vide pour espacement
-        self.console.insert(tk.END, "\n")  # Ligne vide pour espacement
+        # Afficher les partitions et les utilisateurs sans bloquer l'ouverture de la fenêtre
+        self.refresh_discovery()
 
     def setup_gui(self):
         main_frame = ttk.Frame(self.root, padding="10")
@@ -92,22 +111,17 @@ class EZToolsGUI:
         drive_frame = ttk.LabelFrame(control_frame, text="Sélectionner le lecteur", padding="5")
         drive_frame.grid(row=0, column=0, sticky="ew", pady=(0,10))
         
-        # Liste des lecteurs disponibles
-        drives = [f"{chr(x)}:" for x in range(65, 91) if os.path.exists(f"{chr(x)}:")]
+        # Liste des lecteurs disponibles (remplie en arrière-plan)
         self.drive_var = tk.StringVar(value=self.drive)
         
-        drive_buttons_frame = ttk.Frame(drive_frame)
-        drive_buttons_frame.pack(fill=tk.X, padx=5, pady=2)
-        
-        for drive in drives:
-            tk.Radiobutton(
-                drive_buttons_frame,
-                text=drive,
-                variable=self.drive_var,
-                value=drive,
-                font=('Arial', 10),
-                command=self.on_drive_change
-            ).pack(side=tk.LEFT, padx=5)
+        self.drive_buttons_frame = ttk.Frame(drive_frame)
+        self.drive_buttons_frame.pack(fill=tk.X, padx=5, pady=2)
+        ttk.Label(self.drive_buttons_frame, text="Recherche des lecteurs...").pack(side=tk.LEFT, padx=5)
+
+        drive_actions_frame = ttk.Frame(drive_frame)
+        drive_actions_frame.pack(fill=tk.X, padx=5, pady=2)
+        ttk.Button(drive_actions_frame, text="Actualiser", command=lambda: self.refresh_discovery(force=True)).pack(side=tk.LEFT)
+        ttk.Button(drive_actions_frame, text="Disques physiques", command=self.show_physical_disks).pack(side=tk.LEFT, padx=5)
             
         # Zone de sélection de l'utilisateur
         user_frame = ttk.LabelFrame(control_frame, text="Sélectionner l'utilisateur", padding="5")
@@ -148,8 +162,73 @@ class EZToolsGUI:
         ttk.Label(files_frame, text="Nom du fichier de sortie:").grid(row=4, column=0, pady=(5,0))
         ttk.Entry(files_frame, textvariable=self.output_name).grid(row=5, column=0, pady=5, sticky="ew")
         
-        # Bouton d'exécution
-        ttk.Button(control_frame, text="Lancer l'analyse", command=self.run_analysis).grid(row=4, column=0, sticky="ew")
+        # Boutons d'exécution et d'annulation
+        run_frame = ttk.Frame(control_frame)
+        run_frame.grid(row=4, column=0, sticky="ew")
+        run_frame.columnconfigure(0, weight=1)
+
+        self.run_button = ttk.Button(run_frame, text="Lancer l'analyse", command=self.run_analysis)
+        self.run_button.grid(row=0, column=0, sticky="ew")
+        self.cancel_button = ttk.Button(run_frame, text="Annuler", command=self.cancel_analysis, state=tk.DISABLED)
+        self.cancel_button.grid(row=0, column=1, rowspan=2, padx=(5,0), sticky="ns")
+
+        # Analyse de tous les artefacts en parallèle
+        run_all_frame = ttk.Frame(run_frame)
+        run_all_frame.grid(row=1, column=0, sticky="ew", pady=(5,0))
+        run_all_frame.columnconfigure(0, weight=1)
+
+        self.run_all_button = ttk.Button(run_all_frame, text="Lancer tous les outils", command=self.run_all_tools)
+        self.run_all_button.grid(row=0, column=0, sticky="ew")
+        ttk.Label(run_all_frame, text="Simultanés:").grid(row=0, column=1, padx=(5,2))
+        self.max_workers = tk.IntVar(value=os.cpu_count() or 1)
+        ttk.Spinbox(run_all_frame, from_=1, to=32, width=3, textvariable=self.max_workers).grid(row=0, column=2)
+
+        # Relancer les outils même si leurs entrées n'ont pas changé depuis la dernière analyse
+        self.force_rerun = tk.BooleanVar(value=False)
+        ttk.Checkbutton(run_frame, text="Forcer la réanalyse (ignorer le cache)", variable=self.force_rerun).grid(row=2, column=0, columnspan=2, sticky="w", pady=(5,0))
+
+        # Ouvrir une seule super-timeline plutôt qu'un TimelineExplorer par CSV
+        self.merge_timeline = tk.BooleanVar(value=True)
+        ttk.Checkbutton(run_frame, text="Fusionner les résultats en super-timeline", variable=self.merge_timeline).grid(row=3, column=0, columnspan=2, sticky="w")
+
+        # Index SQLite des résultats pour la recherche rapide
+        self.index_results = tk.BooleanVar(value=False)
+        ttk.Checkbutton(run_frame, text="Indexer les résultats pour la recherche", variable=self.index_results).grid(row=4, column=0, columnspan=2, sticky="w")
+
+        # Conversion des CSV en Parquet compressé (nécessite pyarrow)
+        self.convert_parquet = tk.BooleanVar(value=False)
+        ttk.Checkbutton(run_frame, text="Convertir les résultats en Parquet", variable=self.convert_parquet,
+                        state=tk.NORMAL if columnar_available() else tk.DISABLED).grid(row=5, column=0, columnspan=2, sticky="w")
+
+        # Archive ZIP des entrées et des résultats, avec manifeste des empreintes SHA-256
+        self.package_evidence = tk.BooleanVar(value=False)
+        ttk.Checkbutton(run_frame, text="Créer un paquet de preuves (archive + SHA-256)", variable=self.package_evidence).grid(row=6, column=0, columnspan=2, sticky="w")
+        ttk.Button(run_frame, text="Rechercher dans les résultats", command=self.open_search).grid(row=7, column=0, columnspan=2, sticky="ew", pady=(5,0))
+
+        # Copie locale des artefacts (partage réseau, image montée) pendant l'analyse des premiers copiés
+        self.stage_inputs = tk.BooleanVar(value=False)
+        ttk.Checkbutton(run_frame, text="Copier les artefacts en local avant analyse", variable=self.stage_inputs).grid(row=9, column=0, columnspan=2, sticky="w", pady=(5,0))
+
+        # RECmd partitionné: un processus par ruche, CSV fusionnés dans le fichier de sortie
+        self.shard_recmd = tk.BooleanVar(value=False)
+        ttk.Checkbutton(run_frame, text="RECmd : une ruche par processus", variable=self.shard_recmd).grid(row=10, column=0, columnspan=2, sticky="w")
+
+        # Limitation de l'impact des outils sur la machine analysée (analyse à chaud)
+        governor_frame = ttk.LabelFrame(run_frame, text="Impact sur la machine", padding="5")
+        governor_frame.grid(row=8, column=0, columnspan=2, sticky="ew", pady=(5,0))
+        self.low_impact = tk.BooleanVar(value=False)
+        ttk.Checkbutton(governor_frame, text="Faible impact (serveur en production)", variable=self.low_impact,
+                        command=self.on_low_impact_change).grid(row=0, column=0, columnspan=4, sticky="w")
+        ttk.Label(governor_frame, text="Priorité:").grid(row=1, column=0, sticky="w")
+        self.priority = tk.StringVar(value=self.PRIORITY_LABELS["normal"])
+        ttk.Combobox(governor_frame, textvariable=self.priority, values=list(self.PRIORITY_LABELS.values()),
+                     state="readonly", width=10).grid(row=1, column=1, columnspan=3, sticky="w")
+        ttk.Label(governor_frame, text="CPU max %:").grid(row=2, column=0, sticky="w")
+        self.max_cpu = tk.IntVar(value=0)
+        ttk.Spinbox(governor_frame, from_=0, to=100, width=4, textvariable=self.max_cpu).grid(row=2, column=1, sticky="w")
+        ttk.Label(governor_frame, text="Mémoire max %:").grid(row=2, column=2, sticky="w", padx=(5,0))
+        self.max_memory = tk.IntVar(value=0)
+        ttk.Spinbox(governor_frame, from_=0, to=100, width=4, textvariable=self.max_memory).grid(row=2, column=3, sticky="w")
         
         # Panneau de droite pour la console
         console_frame = ttk.LabelFrame(main_frame, text="Console", padding="5")
@@ -157,8 +236,27 @@ class EZToolsGUI:
 
         console_frame.columnconfigure(0, weight=1)
 
-        self.console = scrolledtext.ScrolledText(console_frame, wrap=tk.WORD, height=40)
+        # Console limitée aux dernières lignes, la sortie complète part dans le journal de session
+        log_dir = os.path.join(self.data_dir, "logs")
+        log_path = os.path.join(log_dir, f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+        self.console = BoundedConsole(console_frame, log_path, wrap=tk.WORD, height=34)
         self.console.grid(row=0, column=0, sticky="nsew")
+
+        # Suivi des tâches en cours, avec les ressources consommées par leurs processus
+        job_columns = (
+            ("tool", "Outil", 120), ("status", "Statut", 100), ("elapsed", "Durée", 70), ("cpu", "CPU", 70),
+            ("memory", "Mémoire max", 90), ("read", "Lu", 80), ("written", "Écrit", 80), ("rows", "Lignes", 80),
+            ("code", "Code", 50)
+        )
+        self.jobs_view = ttk.Treeview(console_frame, columns=[c[0] for c in job_columns], show="headings", height=4)
+        for column, heading, width in job_columns:
+            self.jobs_view.heading(column, text=heading)
+            self.jobs_view.column(column, width=width)
+        self.jobs_view.grid(row=1, column=0, sticky="ew", pady=(5,0))
+
+        self.eta_label = ttk.Label(console_frame, text="")
+        self.eta_label.grid(row=2, column=0, sticky="w", pady=(5,0))
+        ttk.Button(console_frame, text="Ouvrir le journal complet", command=self.open_full_log).grid(row=2, column=0, sticky="e", pady=(5,0))
         
         # Configuration du redimensionnement
         self.root.grid_rowconfigure(0, weight=1)
@@ -189,7 +287,7 @@ class EZToolsGUI:
         if tool_name == "MFTECmd":
             self.select_input()
         elif tool_name == "RECmd":
-            config_path = f"{self.drive}\\Windows\\System32\\config"
+            config_path = self.engine.default_input_path(self.drive, "RECmd")
             self.input_path.set(config_path)
             self.console.insert(tk.END, f"Entrée sélectionnée: {config_path}\n")
 
@@ -199,13 +297,13 @@ class EZToolsGUI:
             return
             
         if self.selected_tool == "MFTECmd":
-            mft_path = f"{self.drive}\\$MFT"
+            mft_path = self.engine.default_input_path(self.drive, "MFTECmd")
             self.input_path.set(mft_path)
             self.console.insert(tk.END, f"Entrée sélectionnée: {mft_path}\n")
             return
             
         elif self.selected_tool == "PECmd":
-            prefetch_path = f"{self.drive}\\Windows\\Prefetch"
+            prefetch_path = self.engine.default_input_path(self.drive, "PECmd")
             self.input_path.set(prefetch_path)
             self.console.insert(tk.END, f"Entrée sélectionnée: {prefetch_path}\n")
             return
@@ -213,29 +311,22 @@ class EZToolsGUI:
         elif self.selected_tool == "JLECmd":
             user = self.get_selected_user()
             if user:
-                # Définir les deux chemins pour JLECmd
-                custom_dest = f"{self.drive}\\Users\\{user}\\AppData\\Roaming\\Microsoft\\Windows\\Recent\\CustomDestinations"
-                auto_dest = f"{self.drive}\\Users\\{user}\\AppData\\Roaming\\Microsoft\\Windows\\Recent\\AutomaticDestinations"
+                # Définir les deux chemins pour JLECmd (séparés par ;)
+                input_path = self.engine.default_input_path(self.drive, "JLECmd", user)
                 
-                paths = []
-                if os.path.exists(custom_dest):
-                    paths.append(custom_dest)
-                if os.path.exists(auto_dest):
-                    paths.append(auto_dest)
-                
-                if paths:
-                    self.input_path.set(";".join(paths))  # Utiliser ; comme séparateur
+                if input_path:
+                    self.input_path.set(input_path)
                     self.console.insert(tk.END, f"Entrées sélectionnées:\n")
-                    for path in paths:
+                    for path in input_path.split(";"):
                         self.console.insert(tk.END, f"- {path}\n")
                 else:
                     self.console.insert(tk.END, "Aucun dossier de Jump Lists trouvé\n")
                 return
             
         # Pour RECmd
-        initial_dir = f"{self.drive}\\Windows\\System32\\config"
+        initial_dir = evidence_path(self.drive, "Windows", "System32", "config")
         if not os.path.exists(initial_dir):
-            initial_dir = self.drive + "\\"
+            initial_dir = evidence_path(self.drive)
             
         if self.selected_tool == "RECmd":
             dir_path = filedialog.askdirectory(
@@ -268,151 +359,431 @@ class EZToolsGUI:
         if not all([self.selected_tool, self.input_path.get(), self.output_path.get()]):
             self.console.insert(tk.END, "Erreur: Tous les champs sont requis\n")
             return
-        
-        if self.selected_tool == "JLECmd":
-            # Créer le dossier de sortie avec le nom choisi par l'utilisateur
-            output_dir = os.path.join(self.output_path.get(), self.output_name.get())
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # Séparer les chemins et les traiter séquentiellement
-            paths = self.input_path.get().split(";")
-            
-            csv_files = []  # Liste pour stocker les chemins des fichiers CSV créés
-            
-            for path in paths:
-                self.console.insert(tk.END, f"\nTraitement du dossier: {path}\n")
-                
-                command = [
-                    self.tools["JLECmd"]["command"],
-                    "-d",
-                    f'"{path}"',
-                    "--csv",
-                    f'"{output_dir}"'
-                ]
-                
-                command = " ".join(filter(None, command))
-                self.console.insert(tk.END, f"Exécution: {command}\n")
-                
-                try:
-                    process = subprocess.Popen(
-                        command,
-                        shell=True,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        encoding='utf-8',
-                        errors='replace'
+
+        if self.runner.is_running():
+            self.console.insert(tk.END, "Erreur: Une analyse est déjà en cours\n")
+            return
+
+        # Lire les valeurs de l'interface ici: le thread de fond ne doit pas toucher à Tk
+        self.engine.force = self.force_rerun.get()
+        self.engine.stager = self.stager if self.stage_inputs.get() else None
+        self.engine.shard_recmd = self.shard_recmd.get()
+        try:
+            job = self.engine.build_job(
+                self.selected_tool,
+                self.input_path.get(),
+                self.output_path.get(),
+                self.output_name.get()
+            )
+        except EngineError as e:
+            self.console.insert(tk.END, f"Attention: {str(e)}\n")
+            return
+
+        self.start_jobs([job], max_workers=1)
+
+    def run_all_tools(self):
+        """Lance tous les outils en parallèle sur le lecteur et l'utilisateur sélectionnés"""
+        if not self.output_path.get():
+            self.console.insert(tk.END, "Erreur: Sélectionnez d'abord un dossier de sortie\n")
+            return
+
+        if self.runner.is_running():
+            self.console.insert(tk.END, "Erreur: Une analyse est déjà en cours\n")
+            return
+
+        try:
+            max_workers = max(1, int(self.max_workers.get()))
+        except (tk.TclError, ValueError):
+            max_workers = os.cpu_count() or 1
+
+        user = self.get_selected_user()
+        self.engine.force = self.force_rerun.get()
+        self.engine.stager = self.stager if self.stage_inputs.get() else None
+        self.engine.shard_recmd = self.shard_recmd.get()
+        jobs = self.engine.build_jobs(
+            self.drive,
+            list(self.tools),
+            self.output_path.get(),
+            users=[user] if user else None,
+            on_skip=lambda name, reason: self.console.insert(tk.END, f"{name} ignoré: {reason}\n")
+        )
+
+        if jobs:
+            self.start_jobs(jobs, max_workers=max_workers)
+
+    def start_jobs(self, jobs, max_workers):
+        """Pré-analyse les entrées des tâches en arrière-plan, puis les lance et relève leur sortie"""
+        self.jobs_view.delete(*self.jobs_view.get_children())
+        for job in jobs:
+            self.jobs_view.insert("", tk.END, iid=job.name, values=(job.name, job.status))
+
+        # Fichiers produits pendant l'analyse: indexés et ouverts ensemble à la fin si la fusion est activée
+        self.run_outputs = []
+        self.run_output_dir = self.output_path.get()
+        self.run_max_workers = max_workers
+
+        self.run_button.configure(state=tk.DISABLED)
+        self.run_all_button.configure(state=tk.DISABLED)
+        self.eta_label.configure(text="Pré-analyse des entrées...")
+        governor = Governor(self.governor_settings())
+
+        def start(result, error):
+            if error:
+                self.console.insert(tk.END, f"Erreur lors de la pré-analyse des entrées: {str(error)}\n")
+            else:
+                for job in jobs:
+                    self.console.insert(
+                        tk.END,
+                        f"{job.name}: {job.input_files} fichier(s), {format_bytes(job.input_bytes)}, "
+                        f"durée estimée {format_duration(job.estimate)}\n"
                     )
-                    
-                    while True:
-                        output = process.stdout.readline()
-                        if output == '' and process.poll() is not None:
-                            break
-                        if output:
-                            self.console.insert(tk.END, output)
-                            self.console.see(tk.END)
-                            self.root.update()
-                    
-                    stderr_output = process.stderr.read()
-                    if stderr_output:
-                        self.console.insert(tk.END, f"Erreurs: {stderr_output}\n")
-                    
-                    process.wait()
-                    
-                    if process.returncode != 0:
-                        self.console.insert(tk.END, f"\nErreur lors de l'exécution (code {process.returncode})\n")
-                        return
-                        
-                    # Ajouter les fichiers CSV créés à la liste
-                    for file in os.listdir(output_dir):
-                        if file.endswith('.csv'):
-                            csv_files.append(os.path.join(output_dir, file))
-                            
-                except Exception as e:
-                    self.console.insert(tk.END, f"Erreur: {str(e)}\n")
-                    return
-            
-            self.console.insert(tk.END, "\nAnalyse terminée avec succès\n")
-            self.console.insert(tk.END, f"Fichiers créés dans : {output_dir}\n")
-            
-            # Ouvrir chaque fichier CSV avec TimelineExplorer
-            for csv_file in csv_files:
-                self.open_with_timeline_explorer(csv_file)
-        
+            self.cancel_button.configure(state=tk.NORMAL)
+            self.runner.governor = governor
+            scheduler = JobScheduler(max_workers)
+            self.runner.start(lambda runner: scheduler.run(runner, jobs))
+            self.root.after(self.POLL_INTERVAL_MS, self.poll_runner)
+
+        # Pas derrière un post-traitement de l'analyse précédente: le lancement n'attend que le pré-calcul
+        self.run_in_background(lambda: preflight(jobs, self.throughput), start, self.interactive_executor)
+
+    def on_low_impact_change(self):
+        """Applique le profil faible impact (ou revient aux réglages normaux)"""
+        settings = GOVERNOR_PROFILES["low_impact" if self.low_impact.get() else "normal"]
+        self.priority.set(self.PRIORITY_LABELS[settings.priority])
+        self.max_cpu.set(int(settings.max_cpu_percent or 0))
+        self.max_memory.set(int(settings.max_memory_percent or 0))
+        self.max_workers.set(settings.max_workers or os.cpu_count() or 1)
+
+    def governor_settings(self):
+        """Réglages du gouverneur lus dans l'interface (0 % désactive un seuil)"""
+        priority = next((key for key, label in self.PRIORITY_LABELS.items() if label == self.priority.get()), "normal")
+        try:
+            max_cpu, max_memory = self.max_cpu.get(), self.max_memory.get()
+        except tk.TclError:
+            max_cpu = max_memory = 0
+        # En faible impact, le nombre de tâches simultanées limite aussi les partitions de RECmd
+        max_workers = None
+        if self.low_impact.get():
+            try:
+                max_workers = max(1, int(self.max_workers.get()))
+            except (tk.TclError, ValueError):
+                max_workers = GOVERNOR_PROFILES["low_impact"].max_workers
+        return GovernorSettings(
+            priority=priority,
+            low_io_priority=self.low_impact.get(),
+            max_cpu_percent=max_cpu or None,
+            max_memory_percent=max_memory or None,
+            max_workers=max_workers
+        )
+
+    def poll_runner(self):
+        """Relève par lots les messages du thread d'analyse (appelé par root.after)"""
+        chunks = []
+        finished = False
+        for _ in range(self.POLL_BATCH_SIZE):
+            try:
+                kind, payload = self.runner.queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "text":
+                chunks.append(payload)
+            elif kind == "open":
+                self.run_outputs.append(str(payload))
+                if self.merge_timeline.get():
+                    continue
+                if chunks:
+                    self.console.insert(tk.END, "".join(chunks))
+                    chunks = []
+                self.open_with_timeline_explorer(payload)
+            elif kind == "finished":
+                finished = True
+                break
+
+        if chunks:
+            self.console.insert(tk.END, "".join(chunks))
+            self.console.see(tk.END)
+
+        self.update_jobs_view()
+
+        if finished:
+            self.eta_label.configure(text="")
+            # Les fichiers de l'analyse sont ouverts sans attendre la fin du délai de regroupement
+            if self._viewer_flush is not None:
+                self.flush_viewers()
+            try:
+                self.throughput.record(self.runner.jobs)
+            except OSError as e:
+                self.console.insert(tk.END, f"Erreur lors de l'enregistrement des débits: {str(e)}\n")
+            report = self.write_run_reports()
+            self.console.flush_log()
+            self.run_button.configure(state=tk.NORMAL)
+            self.run_all_button.configure(state=tk.NORMAL)
+            self.cancel_button.configure(state=tk.DISABLED)
+
+            def process_outputs():
+                if self.run_outputs:
+                    self.process_run_outputs(self.run_outputs, self.run_output_dir)
+
+            # Le paquet de preuves est fait avant tout post-traitement des résultats
+            if self.package_evidence.get() and self.runner.jobs:
+                self.package_run_outputs(list(self.runner.jobs), self.run_output_dir, report, then=process_outputs)
+            else:
+                process_outputs()
         else:
-            # Pour les autres outils
-            output_file = Path(self.output_path.get()) / self.output_name.get()
-            command = [
-                self.tools[self.selected_tool]["command"],
-                "-f" if self.selected_tool == "MFTECmd" else "-d",
-                f'"{self.input_path.get()}"',
-                "--csv",
-                f'"{output_file}"'
-            ]
-
-            if self.selected_tool == "RECmd":
-                reb_path = r"..\net6\RECmd\BatchExamples\CTL.reb"
-                if os.path.exists(reb_path):
-                    command.extend(["--bn", f'"{reb_path}"'])
-                else:
-                    self.console.insert(tk.END, f"Attention: Fichier .reb non trouvé à {reb_path}\n")
-                    return
-            
-            command = " ".join(filter(None, command))
-            self.console.insert(tk.END, f"Exécution: {command}\n")
-            
+            self.root.after(self.POLL_INTERVAL_MS, self.poll_runner)
+
+    def package_run_outputs(self, jobs, output_dir, report, then):
+        """Crée le paquet de preuves de l'analyse en arrière-plan, puis appelle then()"""
+        archive = os.path.join(output_dir, f"evidence_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
+        self.console.insert(tk.END, f"Création du paquet de preuves : {archive}\n")
+        messages = []
+
+        def done(manifest, error):
+            self.console.insert(tk.END, "".join(messages))
+            if error:
+                self.console.insert(tk.END, f"Erreur lors de la création du paquet de preuves: {str(error)}\n")
+            self.console.see(tk.END)
+            then()
+
+        self.run_in_background(
+            lambda: package_run(archive, jobs, self.tools, output_dir, extra_files=[report] if report else [], write=messages.append),
+            done
+        )
+
+    def process_run_outputs(self, csv_files, output_dir):
+        """Post-traitement des CSV d'une analyse: conversion Parquet, puis indexation et super-timeline"""
+        def index_and_merge():
+            if self.index_results.get():
+                self.index_run_outputs(csv_files, output_dir)
+            if self.merge_timeline.get():
+                self.open_run_outputs(csv_files, output_dir)
+
+        if not (self.convert_parquet.get() and columnar_available()):
+            index_and_merge()
+            return
+
+        self.console.insert(tk.END, f"Conversion de {len(csv_files)} fichier(s) CSV en Parquet...\n")
+
+        def done(results, error):
+            if error:
+                self.console.insert(tk.END, f"Erreur lors de la conversion Parquet: {str(error)}\n")
+            else:
+                for result in results:
+                    self.console.insert(
+                        tk.END,
+                        f"Parquet créé : {result['path']} (ratio {result['ratio']:.1f}x, "
+                        f"{result['mb_per_second']:.1f} Mo/s)\n"
+                    )
+            self.console.see(tk.END)
+            # Les étapes suivantes lisent les fichiers Parquet quand ils existent
+            index_and_merge()
+
+        self.run_in_background(lambda: [convert_csv(csv_file) for csv_file in csv_files], done)
+
+    def open_run_outputs(self, csv_files, output_dir):
+        """Fusionne les CSV d'une analyse en super-timeline (en arrière-plan) puis l'ouvre"""
+        if len(csv_files) == 1:
+            self.open_with_timeline_explorer(csv_files[0])
+            return
+
+        output_file = os.path.join(output_dir, f"SuperTimeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        self.console.insert(tk.END, f"Fusion de {len(csv_files)} fichiers CSV en super-timeline...\n")
+
+        def done(count, error):
+            if error:
+                self.console.insert(tk.END, f"Erreur lors de la fusion de la super-timeline: {str(error)}\n")
+                for csv_file in csv_files:
+                    self.open_with_timeline_explorer(csv_file)
+                return
+            self.console.insert(tk.END, f"Super-timeline créée ({count} événements) : {output_file}\n")
+            self.console.see(tk.END)
+            self.open_with_timeline_explorer(output_file)
+
+        self.run_in_background(lambda: merge_timelines(csv_files, output_file), done)
+
+    def index_run_outputs(self, csv_files, output_dir):
+        """Charge les CSV d'une analyse dans l'index SQLite du dossier de sortie (en arrière-plan)"""
+        db_path = index_path(output_dir)
+        self.console.insert(tk.END, f"Indexation de {len(csv_files)} fichier(s) CSV...\n")
+
+        def done(count, error):
+            if error:
+                self.console.insert(tk.END, f"Erreur lors de l'indexation: {str(error)}\n")
+            else:
+                self.console.insert(tk.END, f"Index mis à jour ({count} lignes) : {db_path}\n")
+            self.console.see(tk.END)
+
+        self.run_in_background(lambda: sum(index_csv(db_path, csv_file) for csv_file in csv_files), done)
+
+    def open_search(self):
+        """Ouvre le panneau de recherche sur l'index du dossier de sortie"""
+        output_dir = self.output_path.get()
+        if not output_dir or not os.path.exists(index_path(output_dir)):
+            output_dir = filedialog.askdirectory(title="Sélectionner un dossier de résultats indexé")
+            if not output_dir:
+                return
+        if not os.path.exists(index_path(output_dir)):
+            self.console.insert(tk.END, f"Erreur: aucun index trouvé dans {output_dir}\n")
+            return
+        SearchWindow(
+            self.root, index_path(output_dir),
+            lambda func, callback: self.run_in_background(func, callback, self.interactive_executor)
+        )
+
+    def update_jobs_view(self):
+        """Rafraîchit le statut, la durée, les ressources et le code de sortie de chaque tâche, et le temps restant"""
+        remaining = remaining_time(self.runner.jobs, self.run_max_workers)
+        if remaining is not None:
+            self.eta_label.configure(text=f"Temps restant estimé : {format_duration(remaining)}")
+        for job in self.runner.jobs:
+            if not self.jobs_view.exists(job.name):
+                continue
+            if job.started is None:
+                estimate = "" if job.estimate is None else f"~{format_duration(job.estimate)}"
+                self.jobs_view.item(job.name, values=(job.name, job.status, estimate))
+                continue
+            usage = job.usage
+            rows = "" if job.output_rows is None else f"{job.output_rows:,}".replace(",", " ")
+            returncode = "" if job.returncode is None else str(job.returncode)
+            self.jobs_view.item(job.name, values=(
+                job.name, job.status, f"{job.elapsed:.1f} s", f"{usage.cpu_seconds:.1f} s",
+                format_bytes(usage.peak_rss), format_bytes(usage.read_bytes), format_bytes(usage.write_bytes),
+                rows, returncode
+            ))
+
+    def write_run_reports(self):
+        """Écrit le rapport de l'analyse dans le dossier de sortie et le rapport de la session à côté du journal.
+
+        Retourne le chemin du rapport de l'analyse, ou None s'il n'a pas pu être écrit.
+        """
+        self.session_jobs.extend(self.runner.jobs)
+        report = None
+        try:
+            if self.run_output_dir and os.path.isdir(self.run_output_dir):
+                report = os.path.join(self.run_output_dir, f"run_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+                write_run_report(report, self.runner.jobs)
+                self.console.insert(tk.END, f"Rapport d'exécution : {report}\n")
+            write_run_report(os.path.splitext(self.console.log_path)[0] + ".json", self.session_jobs)
+        except OSError as e:
+            self.console.insert(tk.END, f"Erreur lors de l'écriture du rapport d'exécution: {str(e)}\n")
+        return report
+
+    def cancel_analysis(self):
+        """Interrompt l'analyse en cours et termine l'arbre de processus de l'outil"""
+        if self.runner.is_running():
+            self.runner.cancel()
+
+    def open_with_timeline_explorer(self, csv_file):
+        """Demande l'ouverture d'un fichier CSV avec TimelineExplorer.
+
+        Les demandes rapprochées sont regroupées: elles sont ouvertes ensemble après
+        VIEWER_DEBOUNCE_MS, plusieurs fichiers par fenêtre (voir ViewerLauncher).
+        """
+        if not os.path.exists(self.viewer.executable):
+            self.console.insert(tk.END, f"Erreur: TimelineExplorer non trouvé à {self.viewer.executable}\n")
+            return
+        self.viewer.request(csv_file)
+        if self._viewer_flush is not None:
+            self.root.after_cancel(self._viewer_flush)
+        self._viewer_flush = self.root.after(self.VIEWER_DEBOUNCE_MS, self.flush_viewers)
+
+    def flush_viewers(self):
+        """Ouvre dans TimelineExplorer les fichiers en attente (appelé par root.after)"""
+        if self._viewer_flush is not None:
+            self.root.after_cancel(self._viewer_flush)
+            self._viewer_flush = None
+        if not self.viewer.pending:
+            self._viewer_waiting = False
+            return
+        if self._viewer_scanning:
+            # Parcours déjà en cours: les nouveaux fichiers passeront au suivant
+            self._viewer_flush = self.root.after(self.VIEWER_DEBOUNCE_MS, self.flush_viewers)
+            return
+        # Le parcours des processus (psutil) est trop lent pour le thread Tk
+        self._viewer_scanning = True
+        self.run_in_background(self.viewer.running_viewers, self.launch_viewers, self.interactive_executor)
+
+    def launch_viewers(self, viewers, error):
+        """Lance les visualiseurs une fois les TimelineExplorer en cours connus"""
+        self._viewer_scanning = False
+        if error is None:
             try:
-                process = subprocess.Popen(
-                    command,
-                    shell=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    encoding='utf-8',
-                    errors='replace'
-                )
-                
-                while True:
-                    output = process.stdout.readline()
-                    if output == '' and process.poll() is not None:
-                        break
-                    if output:
-                        self.console.insert(tk.END, output)
-                        self.console.see(tk.END)
-                        self.root.update()
-                
-                stderr_output = process.stderr.read()
-                if stderr_output:
-                    self.console.insert(tk.END, f"Erreurs: {stderr_output}\n")
-                
-                process.wait()
-                
-                if process.returncode == 0:
-                    self.console.insert(tk.END, "\nAnalyse terminée avec succès\n")
-                    self.console.insert(tk.END, f"Fichier créé : {output_file}\n")
-                    # Ouvrir le fichier CSV avec TimelineExplorer
-                    self.open_with_timeline_explorer(output_file)
-                else:
-                    self.console.insert(tk.END, f"\nErreur lors de l'exécution (code {process.returncode})\n")
-                    
+                launched, skipped, pending = self.viewer.flush(viewers)
             except Exception as e:
-                self.console.insert(tk.END, f"Erreur: {str(e)}\n")
+                error = e
+        if error is not None:
+            self.console.insert(tk.END, f"Erreur lors de l'ouverture avec TimelineExplorer: {str(error)}\n")
+            return
 
-    def open_with_timeline_explorer(self, csv_file):
-        """Ouvre un fichier CSV avec TimelineExplorer"""
-        try:
-            # Corriger le chemin pour inclure l'extension .exe
-            timeline_explorer = os.path.abspath(os.path.join(os.path.dirname(__file__), self.timeline_explorer_path + ".exe"))
-            
-            if not os.path.exists(timeline_explorer):
-                self.console.insert(tk.END, f"Erreur: TimelineExplorer non trouvé à {timeline_explorer}\n")
-                return
-                
-            command = f'"{timeline_explorer}" "{csv_file}"'
+        for csv_file in launched:
             self.console.insert(tk.END, f"Ouverture avec TimelineExplorer: {csv_file}\n")
-            
-            subprocess.Popen(command, shell=True)
-            
+        for csv_file in skipped:
+            self.console.insert(tk.END, f"Déjà ouvert dans TimelineExplorer: {csv_file}\n")
+        if pending:
+            if not self._viewer_waiting:
+                self.console.insert(
+                    tk.END,
+                    f"{len(pending)} fichier(s) en attente: {self.viewer.max_viewers} fenêtres TimelineExplorer "
+                    "déjà ouvertes, ouverture à la fermeture de l'une d'elles\n"
+                )
+            # Sauf si une demande arrivée pendant le parcours a déjà programmé le suivant
+            if self._viewer_flush is None:
+                self._viewer_flush = self.root.after(self.VIEWER_RETRY_MS, self.flush_viewers)
+        self._viewer_waiting = bool(pending)
+        self.console.see(tk.END)
+
+    def open_full_log(self):
+        """Ouvre le journal complet de la session avec l'application par défaut"""
+        log_path = self.console.flush_log()
+        try:
+            if hasattr(os, "startfile"):
+                os.startfile(log_path)
+            else:
+                subprocess.Popen(["xdg-open", log_path])
         except Exception as e:
-            self.console.insert(tk.END, f"Erreur lors de l'ouverture avec TimelineExplorer: {str(e)}\n")
+            self.console.insert(tk.END, f"Erreur lors de l'ouverture du journal {log_path}: {str(e)}\n")
+
+    def run_in_background(self, func, callback, executor=None):
+        """Exécute func dans un thread de fond puis callback(résultat, erreur) dans le thread Tk"""
+        future = (executor or self.executor).submit(func)
+
+        def check():
+            if not future.done():
+                self.root.after(50, check)
+                return
+            error = future.exception()
+            callback(None if error else future.result(), error)
+
+        self.root.after(50, check)
+
+    def refresh_discovery(self, force=False):
+        """Relance la découverte des lecteurs, partitions et utilisateurs (force: ignorer le cache)"""
+        if force:
+            self.discovery.invalidate()
+        self.run_in_background(lambda: self.discovery.get("drives", list_drives), self.show_drives, self.interactive_executor)
+        self.show_partition_info()
+        self.update_users_list()
+
+    def show_drives(self, drives, error):
+        """Affiche un bouton par lecteur découvert"""
+        for widget in self.drive_buttons_frame.winfo_children():
+            widget.destroy()
+
+        if error:
+            self.console.insert(tk.END, f"Erreur lors de la recherche des lecteurs: {str(error)}\n")
+            drives = []
+        if self.drive not in drives:
+            drives = [self.drive] + drives
+
+        for drive in drives:
+            tk.Radiobutton(
+                self.drive_buttons_frame,
+                text=drive,
+                variable=self.drive_var,
+                value=drive,
+                font=('Arial', 10),
+                command=self.on_drive_change
+            ).pack(side=tk.LEFT, padx=5)
 
     def on_drive_change(self):
         # Mettre à jour le lecteur sélectionné
@@ -421,57 +792,37 @@ class EZToolsGUI:
         # Effacer la console avant de mettre à jour
         self.console.delete('1.0', tk.END)
 
-        #Réafficher la liste des partitions
+        #Réafficher la liste des partitions (depuis le cache si possible)
         self.show_partition_info()
 
         # Mettre à jour la liste des utilisateurs
         self.update_users_list()
         
-        
-        
         # Si un outil est déjà sélectionné, mettre à jour le chemin d'entrée
         if self.selected_tool == "MFTECmd":
             self.select_input()
-        
-        # Forcer une mise à jour de l'interface
-        self.root.update_idletasks()
 
     def show_partition_info(self):
-        """Affiche les informations détaillées sur les disques physiques et leurs partitions"""
-        try:
-            # Utiliser PowerShell pour obtenir les informations détaillées des disques physiques
-            powershell_script = '''
-            Get-Disk | ForEach-Object {
-                $diskNumber = $_.Number
-                $diskSize = [math]::Round($_.Size / 1GB, 2)
-                $diskType = $_.MediaType
-                
-                Write-Host ("Disque physique #" + $diskNumber + " - Type: " + $diskType + " - Taille: " + $diskSize + " Go")
-
-                Get-Partition -DiskNumber $diskNumber | ForEach-Object {
-                    $partition = $_
-                    $volume = Get-Volume -Partition $partition
-                    $driveLetter = if ($volume.DriveLetter) { $volume.DriveLetter + ":" } else { "Non assigné" }
-                    Write-Host ("  Partition " + $partition.PartitionNumber + 
-                                " - Type: " + $partition.Type + 
-                                " - Taille: " + [math]::Round($partition.Size / 1GB, 2) + " Go" +
-                                " - File system: " + $volume.FileSystem +
-                                " - Lecteur: " + $driveLetter)
-                }
-                Write-Host ""
-            }
-            '''
-            
-            # Exécuter le script PowerShell
-            output = subprocess.check_output(["powershell", "-Command", powershell_script], 
-                                            universal_newlines=True, 
-                                            stderr=subprocess.STDOUT)
-            
-            # Afficher les résultats dans la console
-            self.console.insert(tk.END, output)
-            
-        except Exception as e:
-            self.console.insert(tk.END, f"Erreur lors de la récupération des informations de disque: {str(e)}\n")
+        """Affiche les partitions montées, découvertes en arrière-plan via psutil"""
+        def show(output, error):
+            if error:
+                self.console.insert(tk.END, f"Erreur lors de la récupération des informations de disque: {str(error)}\n")
+            else:
+                self.console.insert(tk.END, output + "\n")
+
+        self.run_in_background(lambda: self.discovery.get("partitions", partition_report), show, self.interactive_executor)
+
+    def show_physical_disks(self):
+        """Affiche les disques physiques et leurs partitions, y compris celles sans lettre (PowerShell)"""
+        def show(output, error):
+            if error:
+                self.console.insert(tk.END, f"Erreur lors de la récupération des informations de disque: {str(error)}\n")
+            else:
+                self.console.insert(tk.END, output)
+            self.console.see(tk.END)
+
+        self.console.insert(tk.END, "Lecture des disques physiques...\n")
+        self.run_in_background(lambda: self.discovery.get("physical_disks", physical_disk_report), show, self.interactive_executor)
 
     def show_admin_warning(self):
         """Affiche un avertissement dans la console si le programme n'est pas exécuté en tant qu'administrateur"""
@@ -482,30 +833,29 @@ class EZToolsGUI:
     def update_users_list(self):
         """Met à jour la liste des utilisateurs en fonction du lecteur sélectionné"""
         self.user_listbox.delete(0, tk.END)  # Effacer la liste actuelle
-        users_path = f"{self.drive}\\Users" if os.path.exists(f"{self.drive}\\Users") else f"{self.drive}\\Utilisateurs"
-        
-        
-        if os.path.exists(users_path):
-            try:
-                # Lister tous les dossiers dans Users/Utilisateurs sauf les dossiers système
-                users = []
-                for d in os.listdir(users_path):
-                    full_path = os.path.join(users_path, d)
-                    if (os.path.isdir(full_path) 
-                        and not d.startswith(".") 
-                        and d not in ["Public", "Default", "Default User", "All Users", "defaultuser0"]):
-                        users.append(d)
-                
-                for user in users:
-                    self.user_listbox.insert(tk.END, user)
-                if users:  # Sélectionner le premier utilisateur par défaut
-                    self.user_listbox.selection_set(0)
-                    
-                self.console.insert(tk.END, f"Utilisateurs trouvés: {', '.join(users)}\n")
-            except Exception as e:
-                self.console.insert(tk.END, f"Erreur lors de la lecture des utilisateurs: {str(e)}\n")
-        else:
-            self.console.insert(tk.END, f"Dossier Users/Utilisateurs non trouvé sur le lecteur {self.drive}\n")
+        drive = self.drive
+
+        def show(users, error):
+            if drive != self.drive:
+                return  # Le lecteur a changé entre-temps
+
+            if error:
+                self.console.insert(tk.END, f"Erreur lors de la lecture des utilisateurs: {str(error)}\n")
+                return
+
+            if users is None:
+                self.console.insert(tk.END, f"Dossier Users/Utilisateurs non trouvé sur le lecteur {drive}\n")
+                return
+
+            self.user_listbox.delete(0, tk.END)
+            for user in users:
+                self.user_listbox.insert(tk.END, user)
+            if users:  # Sélectionner le premier utilisateur par défaut
+                self.user_listbox.selection_set(0)
+
+            self.console.insert(tk.END, f"Utilisateurs trouvés: {', '.join(users)}\n")
+
+        self.run_in_background(lambda: self.discovery.get(("users", drive), lambda: find_users(drive)), show, self.interactive_executor)
 
     def get_selected_user(self):
         """Retourne l'utilisateur sélectionné ou None"""
@@ -514,6 +864,191 @@ class EZToolsGUI:
             return self.user_listbox.get(selection[0])
         return None
 
+class BoundedConsole(scrolledtext.ScrolledText):
+    """Console qui ne garde que les dernières lignes et copie toute la sortie dans un journal.
+
+    Les lignes de progression répétées (mêmes lignes aux nombres près, avec un pourcentage)
+    remplacent la ligne précédente au lieu d'en ajouter une nouvelle.
+    """
+
+    MAX_LINES = 5000
+    PROGRESS_RE = re.compile(r"\d+(?:[.,]\d+)?\s*%")
+
+    def __init__(self, master, log_path, max_lines=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.max_lines = max_lines or self.MAX_LINES
+        self.log_path = log_path
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        self.log_file = open(log_path, "a", encoding="utf-8", errors="replace")
+        self._progress_key = None
+        self.bind("<Destroy>", lambda event: self.log_file.close() if event.widget is self else None)
+
+    def insert(self, index, chars, *args):
+        self.log_file.write(chars)
+
+        if index != tk.END or args:
+            self._progress_key = None
+            super().insert(index, chars, *args)
+            return
+
+        *lines, remainder = chars.split("\n")
+        replace_last = False
+        kept = []
+        for line in lines:
+            # Ne garder que le dernier état d'une ligne réécrite avec \r (hors fin de ligne \r\n)
+            line = line.rstrip("\r").rsplit("\r", 1)[-1]
+            key = self.progress_key(line)
+            if key is not None and key == self._progress_key:
+                if kept:
+                    kept[-1] = line
+                else:
+                    replace_last = True
+                    kept.append(line)
+            else:
+                kept.append(line)
+            self._progress_key = key
+
+        if remainder:
+            self._progress_key = None
+
+        if replace_last:
+            super().delete("end-2l linestart", "end-1c")
+        text = "".join(line + "\n" for line in kept) + remainder
+        if text:
+            super().insert(tk.END, text)
+        self._trim()
+
+    def delete(self, index1, index2=None):
+        self._progress_key = None
+        super().delete(index1, index2)
+
+    def progress_key(self, line):
+        """Retourne la forme d'une ligne de progression (nombres masqués), ou None"""
+        if not self.PROGRESS_RE.search(line):
+            return None
+        return re.sub(r"\d+", "#", line)
+
+    def _trim(self):
+        # Supprimer par blocs pour ne pas payer une suppression à chaque insertion
+        line_count = int(self.index("end-1c").split(".")[0])
+        if line_count > self.max_lines + self.max_lines // 10:
+            super().delete("1.0", f"{line_count - self.max_lines + 1}.0")
+
+    def flush_log(self):
+        """Écrit le journal sur le disque et retourne son chemin"""
+        self.log_file.flush()
+        return self.log_path
+
+
+class SearchWindow:
+    """Panneau de recherche par mot-clé et plage de dates dans l'index des résultats"""
+
+    PAGE_SIZE = 200
+    COLUMNS = (("timestamp", "Date", 190), ("kind", "Type", 130), ("tool", "Outil", 90),
+               ("description", "Description", 420), ("details", "Détails", 260), ("source", "Fichier", 160))
+
+    def __init__(self, master, db_path, run_in_background):
+        self.db_path = db_path
+        self.run_in_background = run_in_background
+        self.page = 0
+
+        self.window = tk.Toplevel(master)
+        self.window.title(f"Recherche - {db_path}")
+        self.window.geometry("1200x600")
+
+        query_frame = ttk.Frame(self.window, padding="5")
+        query_frame.pack(fill=tk.X)
+        self.keyword = tk.StringVar()
+        self.start = tk.StringVar()
+        self.end = tk.StringVar()
+        self.tool = tk.StringVar()
+        ttk.Label(query_frame, text="Mots-clés:").pack(side=tk.LEFT)
+        keyword_entry = ttk.Entry(query_frame, textvariable=self.keyword, width=30)
+        keyword_entry.pack(side=tk.LEFT, padx=5)
+        keyword_entry.bind("<Return>", lambda event: self.run_search(0))
+        ttk.Label(query_frame, text="Du:").pack(side=tk.LEFT)
+        ttk.Entry(query_frame, textvariable=self.start, width=20).pack(side=tk.LEFT, padx=5)
+        ttk.Label(query_frame, text="Au:").pack(side=tk.LEFT)
+        ttk.Entry(query_frame, textvariable=self.end, width=20).pack(side=tk.LEFT, padx=5)
+        ttk.Label(query_frame, text="Outil:").pack(side=tk.LEFT)
+        ttk.Combobox(query_frame, textvariable=self.tool, width=14,
+                     values=("", "MFTECmd", "PECmd", "PECmd Timeline", "JLECmd", "RECmd")).pack(side=tk.LEFT, padx=5)
+        ttk.Button(query_frame, text="Rechercher", command=lambda: self.run_search(0)).pack(side=tk.LEFT, padx=5)
+
+        results_frame = ttk.Frame(self.window, padding="5")
+        results_frame.pack(fill=tk.BOTH, expand=True)
+        self.results = ttk.Treeview(results_frame, columns=[c[0] for c in self.COLUMNS], show="headings")
+        for column, heading, width in self.COLUMNS:
+            self.results.heading(column, text=heading)
+            self.results.column(column, width=width)
+        scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.results.yview)
+        self.results.configure(yscrollcommand=scrollbar.set)
+        self.results.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        pager_frame = ttk.Frame(self.window, padding="5")
+        pager_frame.pack(fill=tk.X)
+        ttk.Button(pager_frame, text="< Précédent", command=lambda: self.run_search(self.page - 1)).pack(side=tk.LEFT)
+        ttk.Button(pager_frame, text="Suivant >", command=lambda: self.run_search(self.page + 1)).pack(side=tk.LEFT, padx=5)
+        self.status = tk.StringVar()
+        ttk.Label(pager_frame, textvariable=self.status).pack(side=tk.LEFT, padx=10)
+
+    def run_search(self, page):
+        page = max(0, page)
+        keyword, start, end, tool = self.keyword.get().strip(), self.start.get().strip(), self.end.get().strip(), self.tool.get()
+        started = time.monotonic()
+        self.status.set("Recherche...")
+
+        def show(rows, error):
+            if error:
+                self.status.set(f"Erreur: {str(error)}")
+                return
+            self.page = page
+            self.results.delete(*self.results.get_children())
+            for row in rows:
+                self.results.insert("", tk.END, values=row)
+            self.status.set(f"Page {page + 1} - {len(rows)} résultat(s) en {time.monotonic() - started:.2f} s")
+
+        self.run_in_background(
+            lambda: search(self.db_path, keyword or None, start or None, end or None, tool or None, page, self.PAGE_SIZE),
+            show
+        )
+
+
+class QueueRunner(ToolRunner):
+    """Exécute les tâches dans un thread de fond et transmet leur sortie à l'interface via une file"""
+
+    def __init__(self):
+        super().__init__()
+        self.queue = queue.Queue()
+        self.thread = None
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, target):
+        """Lance la coroutine target(runner) dans un thread de fond"""
+        self.cancelled.clear()
+        self.thread = threading.Thread(target=self._run, args=(target,), daemon=True)
+        self.thread.start()
+
+    def _run(self, target):
+        try:
+            asyncio.run(target(self))
+        except Exception as e:
+            self.write(f"Erreur: {str(e)}\n")
+        finally:
+            self.queue.put(("finished", None))
+
+    def write(self, text):
+        """Envoie du texte à afficher dans la console"""
+        self.queue.put(("text", text))
+
+    def open_file(self, path):
+        """Demande à l'interface d'ouvrir un fichier avec TimelineExplorer"""
+        self.queue.put(("open", path))
+
+
 def is_admin():
     try:
         return ctypes.windll.shell32.IsUserAnAdmin()
@@ -521,6 +1056,7 @@ def is_admin():
         return False
 
 def main():
+    """Point d'entrée de l'interface graphique (voir eztools_cli.py pour le mode sans interface)"""
     root = tk.Tk()
     app = EZToolsGUI(root)
     root.mainloop()
@@ -0,0 +1,52 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eztools_bench import make_evidence, make_stand_in_tools  # noqa: E402
+from eztools_core import JobScheduler, ToolRunner  # noqa: E402
+
+
+class CollectingRunner(ToolRunner):
+    """ToolRunner qui garde la sortie des outils au lieu de l'afficher"""
+
+    def __init__(self):
+        super().__init__()
+        self.text = []
+
+    def write(self, text):
+        self.text.append(text)
+
+
+def run_jobs(jobs, max_workers=2):
+    runner = CollectingRunner()
+    asyncio.run(JobScheduler(max_workers).run(runner, jobs))
+    return runner
+
+
+def count_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for _ in f)
+
+
+@pytest.fixture(scope="session")
+def tools_dir(tmp_path_factory):
+    if os.name == "nt":
+        pytest.skip("les outils de substitution ne peuvent pas être lancés sous Windows")
+    return make_stand_in_tools(str(tmp_path_factory.mktemp("net6")))
+
+
+@pytest.fixture
+def evidence(tmp_path):
+    root = tmp_path / "ev"
+    root.mkdir()
+    return make_evidence(str(root))
+
+
+@pytest.fixture(autouse=True)
+def stand_in_env(monkeypatch):
+    for key, value in {"LINES": 5, "LINES_PER_SECOND": 0, "STDERR_EVERY": 0, "EXIT_CODE": 0, "CSV_ROWS": 10}.items():
+        monkeypatch.setenv(f"EZBENCH_{key}", str(value))
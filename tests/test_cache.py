@@ -0,0 +1,73 @@
+import os
+
+from conftest import count_lines, run_jobs
+from eztools_cache import ResultCache, fingerprint_inputs
+from eztools_core import Engine
+
+
+def test_store_and_lookup(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    source = tmp_path / "out.csv"
+    source.write_text("a,b\n1,2\n")
+    cache.store("k", [str(source)])
+
+    # L'entrée est une copie: une réécriture de la sortie ne la modifie pas
+    source.write_text("a,b\n3,4\n")
+    files = ResultCache(str(tmp_path / "cache")).lookup("k")
+    assert [os.path.basename(path) for path in files] == ["out.csv"]
+    with open(files[0]) as f:
+        assert f.read() == "a,b\n1,2\n"
+    assert cache.lookup("autre") is None
+
+
+def test_lookup_drops_modified_entry(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    source = tmp_path / "out.csv"
+    source.write_text("a,b\n1,2\n")
+    cache.store("k", [str(source)])
+    with open(cache.lookup("k")[0], "a") as f:
+        f.write("5,6\n")
+    assert cache.lookup("k") is None
+
+
+def test_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=25)
+    for key in ("a", "b", "c"):
+        path = tmp_path / f"{key}.csv"
+        path.write_text("x" * 10)
+        cache.store(key, [str(path)])
+    assert cache.lookup("a") is None
+    assert cache.lookup("b") and cache.lookup("c")
+
+
+def test_fingerprint_follows_inputs(tmp_path):
+    path = tmp_path / "input"
+    path.write_bytes(b"1")
+    before = fingerprint_inputs([str(path)])
+    path.write_bytes(b"12")
+    assert fingerprint_inputs([str(path)]) != before
+
+
+def test_cache_hit_with_reused_output_name(tools_dir, evidence, tmp_path, monkeypatch):
+    engine = Engine(tools_dir, cache=ResultCache(str(tmp_path / "cache")))
+    output = tmp_path / "out"
+
+    def run(tool, rows):
+        monkeypatch.setenv("EZBENCH_CSV_ROWS", str(rows))
+        job = engine.build_job(tool, engine.default_input_path(evidence, tool), str(output), "x.csv")
+        runner = run_jobs([job])
+        assert job.status == "Terminé"
+        return runner
+
+    run("MFTECmd", 3)
+    run("PECmd", 51)
+    runner = run("MFTECmd", 99)
+    assert any("cache réutilisé" in text for text in runner.text)
+    assert count_lines(output / "x.csv") == 1 + 3
+
+    # Un succès de cache restaure aussi le CSV annexe de PECmd
+    os.remove(output / "x_Timeline.csv")
+    runner = run("PECmd", 99)
+    assert any("cache réutilisé" in text for text in runner.text)
+    assert count_lines(output / "x.csv") == 1 + 51
+    assert count_lines(output / "x_Timeline.csv") == 1 + 51
@@ -0,0 +1,29 @@
+import json
+import os
+
+import pytest
+
+import eztools_cli
+from eztools_preflight import ThroughputHistory
+
+
+def test_parquet_without_pyarrow(tmp_path, monkeypatch, capsys):
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps({"root": str(tmp_path), "output_dir": str(tmp_path / "out")}), encoding="utf-8")
+    monkeypatch.setattr(eztools_cli, "columnar_available", lambda: False)
+    monkeypatch.setattr(eztools_cli, "run_entry", lambda *args, **kwargs: pytest.fail("analyse lancée sans pyarrow"))
+
+    # Refusé avant de lancer les outils
+    assert eztools_cli.main([str(manifest), "--parquet", "--no-cache"]) == 2
+    assert "pyarrow" in capsys.readouterr().err
+
+
+def test_main_runs_entry(tools_dir, evidence, tmp_path, monkeypatch):
+    output_dir = tmp_path / "out"
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps({"root": evidence, "output_dir": str(output_dir), "tools": ["PECmd"]}), encoding="utf-8")
+    history = str(tmp_path / "throughput.json")
+    monkeypatch.setattr(eztools_cli, "ThroughputHistory", lambda: ThroughputHistory(history))
+
+    assert eztools_cli.main([str(manifest), "--tools-dir", tools_dir, "--no-cache", "--max-workers", "1"]) == 0
+    assert any(name.startswith("PECmd") and name.endswith(".csv") for name in os.listdir(output_dir))
@@ -0,0 +1,30 @@
+import pytest
+
+tk = pytest.importorskip("tkinter")
+
+
+@pytest.fixture
+def root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("pas d'affichage")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
+def test_crlf_lines(root, tmp_path):
+    from gui4easytools import BoundedConsole
+
+    console = BoundedConsole(root, str(tmp_path / "logs" / "session.log"))
+    console.insert(tk.END, "[MFTECmd] Processing $MFT...\r\n[MFTECmd] Done\r\n")
+    assert console.get("1.0", "end-1c") == "[MFTECmd] Processing $MFT...\n[MFTECmd] Done\n"
+
+
+def test_carriage_return_rewrite(root, tmp_path):
+    from gui4easytools import BoundedConsole
+
+    console = BoundedConsole(root, str(tmp_path / "logs" / "session.log"))
+    console.insert(tk.END, "Copie 10%\rCopie 20%\rCopie 30%\r\n")
+    assert console.get("1.0", "end-1c") == "Copie 30%\n"
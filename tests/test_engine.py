@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from conftest import count_lines, run_jobs
+from eztools_core import Engine, EngineError
+
+
+def test_build_job_unknown_tool(tools_dir, tmp_path):
+    with pytest.raises(EngineError):
+        Engine(tools_dir).build_job("Inconnu", "x", str(tmp_path), "x.csv")
+
+
+def test_run_tool(tools_dir, evidence, tmp_path):
+    engine = Engine(tools_dir)
+    job = engine.build_job("MFTECmd", engine.default_input_path(evidence, "MFTECmd"), str(tmp_path), "mft.csv")
+    runner = run_jobs([job])
+
+    output = str(tmp_path / "mft.csv")
+    assert (job.status, job.returncode) == ("Terminé", 0)
+    assert runner.output_files == [output]
+    assert job.outputs == [output]
+    assert job.output_rows == 10
+    assert job.commands[0][:3] == [engine.tools["MFTECmd"]["command"], "-f", os.path.join(evidence, "$MFT")]
+
+
+def test_run_tool_error(tools_dir, evidence, tmp_path, monkeypatch):
+    monkeypatch.setenv("EZBENCH_EXIT_CODE", "2")
+    engine = Engine(tools_dir)
+    job = engine.build_job("PECmd", engine.default_input_path(evidence, "PECmd"), str(tmp_path), "pf.csv")
+    runner = run_jobs([job])
+    assert (job.status, job.returncode) == ("Erreur", 2)
+    assert runner.output_files == []
+
+
+def test_build_jobs_skips_tools_without_input(tools_dir, evidence, tmp_path):
+    skipped = []
+    jobs = Engine(tools_dir).build_jobs(evidence, ["MFTECmd", "JLECmd"], str(tmp_path), users=[], on_skip=lambda *a: skipped.append(a))
+    assert [job.tool for job in jobs] == ["MFTECmd"]
+    assert skipped == [("JLECmd", "aucun utilisateur sélectionné")]
+
+
+def test_jlecmd_ignores_stale_csv(tools_dir, evidence, tmp_path):
+    engine = Engine(tools_dir)
+    stale = tmp_path / "jl" / "AutomaticDestinations" / "20230101000000_AutomaticDestinations.csv"
+    stale.parent.mkdir(parents=True)
+    stale.write_text("a\n")
+
+    job = engine.build_job("JLECmd", engine.default_input_path(evidence, "JLECmd", "bench"), str(tmp_path), "jl")
+    runner = run_jobs([job])
+
+    assert job.status == "Terminé"
+    assert str(stale) not in runner.output_files
+    assert sorted(os.path.basename(os.path.dirname(path)) for path in runner.output_files) == [
+        "AutomaticDestinations", "CustomDestinations"
+    ]
+
+
+def test_recmd_sharded(tools_dir, evidence, tmp_path):
+    config = os.path.join(evidence, "Windows", "System32", "config")
+    for name in ("SYSTEM", "SOFTWARE"):
+        with open(os.path.join(config, name), "wb") as f:
+            f.write(b"regf" + bytes(60))
+    with open(os.path.join(config, "SYSTEM.LOG1"), "wb") as f:
+        f.write(b"regf" + bytes(60))
+    with open(os.path.join(config, "notes.txt"), "w") as f:
+        f.write("pas une ruche")
+
+    engine = Engine(tools_dir)
+    engine.shard_recmd = True
+    job = engine.build_job("RECmd", config, str(tmp_path), "reg.csv")
+    run_jobs([job])
+
+    assert job.status == "Terminé"
+    assert len(job.commands) == 2
+    assert count_lines(tmp_path / "reg.csv") == 1 + 2 * 10
+    assert not os.path.exists(str(tmp_path / "reg.csv") + "_shards")
+
+
+def test_run_tool_reports_every_csv(tools_dir, evidence, tmp_path):
+    engine = Engine(tools_dir)
+    job = engine.build_job("PECmd", engine.default_input_path(evidence, "PECmd"), str(tmp_path), "pf.csv")
+    run_jobs([job])
+    assert job.outputs == [str(tmp_path / "pf.csv"), str(tmp_path / "pf_Timeline.csv")]
+    assert job.output_rows == 2 * 10
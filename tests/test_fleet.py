@@ -0,0 +1,8 @@
+from eztools_fleet import root_label
+
+
+def test_root_label_unique():
+    # Même nom lisible, racines différentes
+    assert root_label("/tmp/fl/r 2") != root_label("/tmp/fl/r_2")
+    assert root_label("/tmp/fl/r 2").startswith("tmp_fl_r_2_")
+    assert root_label("/mnt/img01") == root_label("/mnt/img01")
@@ -0,0 +1,59 @@
+import codecs
+import csv
+
+import pytest
+
+from eztools_core import EngineError, merge_csv_files
+from eztools_timeline import TIMELINE_COLUMNS, merge_timelines
+
+
+def test_merge_csv_files(tmp_path):
+    first = tmp_path / "1.csv"
+    second = tmp_path / "2.csv"
+    first.write_bytes(codecs.BOM_UTF8 + b"a,b\r\n1,2\r\n")
+    second.write_bytes(b"a,b\r\n3,4")  # sans fin de ligne finale
+    output = tmp_path / "out.csv"
+
+    assert merge_csv_files([str(first), str(second)], str(output)) == 2
+    assert output.read_bytes() == codecs.BOM_UTF8 + b"a,b\r\n1,2\r\n3,4\n"
+
+
+def test_merge_csv_files_header_mismatch(tmp_path):
+    first = tmp_path / "1.csv"
+    second = tmp_path / "2.csv"
+    first.write_text("a,b\n1,2\n")
+    second.write_text("a,c\n3,4\n")
+    with pytest.raises(EngineError):
+        merge_csv_files([str(first), str(second)], str(tmp_path / "out.csv"))
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+@pytest.mark.parametrize("chunk_rows,fan_in", [(200_000, 64), (2, 2)])
+def test_merge_timelines(tmp_path, chunk_rows, fan_in):
+    mft = tmp_path / "mft.csv"
+    prefetch = tmp_path / "pf_Timeline.csv"
+    _write_csv(mft, ["EntryNumber", "ParentPath", "FileName", "Created0x10", "LastModified0x10"], [
+        [1, ".\\Windows", "a.dll", "2024-03-02 10:00:00.0000000", "2024-03-05 10:00:00.0000000"],
+        [2, ".\\Windows", "b.dll", "2024-03-01 10:00:00.0000000", ""]
+    ])
+    _write_csv(prefetch, ["RunTime", "ExecutableName"], [
+        ["2024-03-04 10:00:00", "A.EXE"],
+        ["3/3/2024 10:00:00", "B.EXE"]
+    ])
+    output = tmp_path / "timeline.csv"
+
+    count = merge_timelines([str(mft), str(prefetch)], str(output), chunk_rows=chunk_rows, fan_in=fan_in, temp_dir=str(tmp_path))
+
+    with open(output, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == TIMELINE_COLUMNS
+    assert count == len(rows) - 1 == 5
+    assert [row[0][:10] for row in rows[1:]] == ["2024-03-01", "2024-03-02", "2024-03-03", "2024-03-04", "2024-03-05"]
+    assert [row[2] for row in rows[1:]] == ["MFTECmd", "MFTECmd", "PECmd Timeline", "PECmd Timeline", "MFTECmd"]
+    assert rows[1][3] == ".\\Windows\\b.dll"
@@ -0,0 +1,54 @@
+import asyncio
+import json
+import os
+import zipfile
+
+from conftest import CollectingRunner
+from eztools_core import Engine, JobScheduler
+from eztools_package import package_run
+from eztools_staging import Stager
+
+
+def _run_staged(engine, evidence, output_dir):
+    job = engine.build_job("PECmd", engine.default_input_path(evidence, "PECmd"), output_dir, "pf.csv")
+    asyncio.run(JobScheduler(1).run(CollectingRunner(), [job]))
+    assert job.status == "Terminé"
+    return job
+
+
+def _package(job, engine, output_dir, name):
+    archive = os.path.join(output_dir, name)
+    with open(package_run(archive, [job], engine.tools, output_dir, write=lambda text: None), encoding="utf-8") as f:
+        return json.load(f), zipfile.ZipFile(archive)
+
+
+def test_package_staged_inputs(tools_dir, evidence, tmp_path):
+    prefetch = os.path.join(evidence, "Windows", "Prefetch")
+    for name in ("A.pf", "B.pf"):
+        with open(os.path.join(prefetch, name), "wb") as f:
+            f.write(name.encode() * 100)
+    engine = Engine(tools_dir)
+    engine.stager = Stager(str(tmp_path / "staging"))
+    output_dir = str(tmp_path / "out")
+
+    job = _run_staged(engine, evidence, output_dir)
+    manifest, archive = _package(job, engine, output_dir, "evidence.zip")
+    inputs = [record for record in manifest["files"] if record["role"] == "input"]
+    outputs = [record["path"] for record in manifest["files"] if record["role"] == "output"]
+
+    # Copies de la session: lues en local et vérifiées avec le hachage pris à la copie
+    assert [os.path.basename(record["path"]) for record in inputs] == ["A.pf", "B.pf"]
+    assert all(record["read_from"].startswith(str(tmp_path / "staging")) for record in inputs)
+    assert all(record["matches_original"] for record in inputs)
+    assert archive.read(inputs[0]["archive_name"]) == b"A.pf" * 100
+    assert [os.path.basename(path) for path in outputs] == ["pf.csv", "pf_Timeline.csv"]
+
+    # Copie réutilisée d'une session précédente et fichier supprimé de la source:
+    # l'original est relu et le fichier supprimé n'apparaît plus
+    os.remove(os.path.join(prefetch, "B.pf"))
+    engine.stager = Stager(str(tmp_path / "staging"))
+    job = _run_staged(engine, evidence, output_dir)
+    manifest, _ = _package(job, engine, output_dir, "evidence2.zip")
+    inputs = [record for record in manifest["files"] if record["role"] == "input"]
+    assert [os.path.basename(record["path"]) for record in inputs] == ["A.pf"]
+    assert "read_from" not in inputs[0]
@@ -0,0 +1,35 @@
+import os
+import threading
+
+import pytest
+
+from eztools_staging import CopyCancelled, copy_file, copy_tree
+
+
+def test_copy_tree_reuses_and_syncs(tmp_path):
+    source = tmp_path / "Prefetch"
+    (source / "sub").mkdir(parents=True)
+    (source / "A.pf").write_bytes(b"a" * 10)
+    (source / "B.pf").write_bytes(b"b" * 10)
+    (source / "sub" / "C.pf").write_bytes(b"c")
+    destination = tmp_path / "staging" / "Prefetch"
+
+    assert copy_tree(str(source), str(destination)) == (3, 21, 0, 0)
+    assert copy_tree(str(source), str(destination)) == (3, 0, 3, 0)
+
+    # Un fichier supprimé de la source ne reste pas dans la copie réutilisée
+    os.remove(source / "B.pf")
+    (source / "sub" / "C.pf").unlink()
+    (source / "sub").rmdir()
+    assert copy_tree(str(source), str(destination)) == (1, 0, 1, 2)
+    assert os.listdir(destination) == ["A.pf"]
+
+
+def test_copy_file_cancelled(tmp_path):
+    source = tmp_path / "$MFT"
+    source.write_bytes(b"x" * 1024)
+    cancelled = threading.Event()
+    cancelled.set()
+    with pytest.raises(CopyCancelled):
+        copy_file(str(source), str(tmp_path / "copy" / "$MFT"), cancelled=cancelled)
+    assert os.listdir(tmp_path / "copy") == []
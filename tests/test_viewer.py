@@ -0,0 +1,15 @@
+import os
+
+from eztools_viewer import ViewerLauncher
+
+
+def test_flush_with_scanned_viewers(tmp_path):
+    opened, waiting = str(tmp_path / "a.csv"), str(tmp_path / "b.csv")
+    launcher = ViewerLauncher(str(tmp_path / "TimelineExplorer.exe"), max_viewers=1)
+    launcher.request(opened)
+    launcher.request(waiting)
+
+    # Parcours fait ailleurs: un visualiseur ouvert sur a.csv occupe la seule place
+    viewers = [(1234, {os.path.normcase(os.path.abspath(opened))})]
+    assert launcher.flush(viewers) == ([], [opened], [waiting])
+    assert launcher.pending == [waiting]